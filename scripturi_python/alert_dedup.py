@@ -0,0 +1,97 @@
+# Suprimarea alertelor duplicate, cu jurnal persistent al alertelor
+# O alerta noua este suprimata daca in ultima perioada de pauza s-a trimis deja una la mai putin de R metri
+# (distanta haversine, deci variatiile mici ale GPS-ului nu mai produc SMS-uri noi). In plus, fiecare
+# destinatar primeste cel mult un numar limitat de SMS-uri pe ora. Jurnalul este o baza SQLite pe card,
+# astfel incat starea se pastreaza si dupa o repornire a unitatii. Pentru fiecare SMS se pastreaza si
+# rezultatul livrarii: referinta '+CMGS' intoarsa de modul sau eroarea.
+
+import math              # Pentru formula haversine
+import sqlite3           # Pentru jurnalul persistent al alertelor
+import threading         # Jurnalul este folosit si din firul dispecerului SMS
+import time              # Pentru momentul fiecarei alerte
+
+RAZA_PAMANT_M = 6371000.0
+
+# Coloanele adaugate pentru rezultatul livrarii (jurnalele create inainte sunt completate la deschidere)
+COLOANE_LIVRARE = {'trimis': 'INTEGER', 'referinta': 'INTEGER', 'eroare': 'TEXT'}
+
+# Conditia SQL pentru alertele care suprima alte alerte: livrate sau inca in curs de trimitere
+# (fara rezultat, dar mai noi decat timeout-ul livrarii)
+CONDITIE_LIVRATA = '(trimis = 1 OR (trimis IS NULL AND timp > ?))'
+
+
+# Distanta in metri intre doua puncte date prin latitudine si longitudine (formula haversine)
+def distanta_m(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * RAZA_PAMANT_M * math.asin(math.sqrt(a))
+
+
+class AlertSuppressor:
+    # cale_db: fisierul SQLite al jurnalului; raza_m: distanta sub care alertele sunt considerate duplicate
+    # pauza_s: cat timp se suprima alertele din aceeasi zona; max_pe_ora: limita de SMS-uri pe destinatar
+    # timeout_livrare_s: dupa cat timp o alerta fara rezultat al livrarii nu mai este considerata in curs
+    def __init__(self, cale_db='alerte.db', raza_m=200.0, pauza_s=900.0, max_pe_ora=5, timeout_livrare_s=300.0):
+        self.raza_m = raza_m
+        self.pauza_s = pauza_s
+        self.max_pe_ora = max_pe_ora
+        self.timeout_livrare_s = timeout_livrare_s
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(cale_db, check_same_thread=False)
+        self._db.execute('CREATE TABLE IF NOT EXISTS alerte ('
+                         'id INTEGER PRIMARY KEY, timp REAL, lat REAL, lon REAL, numar TEXT, text TEXT)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS alerte_timp ON alerte (timp)')
+        existente = {rand[1] for rand in self._db.execute('PRAGMA table_info(alerte)')}
+        for coloana, tip in COLOANE_LIVRARE.items():
+            if coloana not in existente:
+                self._db.execute(f'ALTER TABLE alerte ADD COLUMN {coloana} {tip}')
+        # Alertele ramase fara rezultat de la o rulare anterioara (oprire sau cadere inainte de trimitere) nu au
+        # fost livrate sigur; sunt marcate ca esuate, ca sa nu suprime alertele noi din aceeasi zona
+        self._db.execute("UPDATE alerte SET trimis = 0, eroare = 'fara rezultat (rulare intrerupta)' WHERE trimis IS NULL")
+        self._db.commit()
+
+    # Intoarce True daca nu s-a trimis nicio alerta in raza data in ultima perioada de pauza
+    # (alertele a caror livrare a esuat sau nu s-a terminat in timeout_livrare_s nu suprima o alerta noua).
+    # Alertele fara pozitie (lat si lon None, GPS fara fix) sunt comparate doar intre ele: unitatea este fixa,
+    # deci o alerta recenta fara pozitie suprima o alta alerta fara pozitie
+    def trebuie_trimisa(self, lat, lon, acum=None):
+        acum = time.time() if acum is None else acum
+        with self._lock:
+            recente = self._db.execute(f'SELECT DISTINCT lat, lon FROM alerte WHERE timp > ? AND {CONDITIE_LIVRATA}',
+                                       (acum - self.pauza_s, acum - self.timeout_livrare_s)).fetchall()
+        if lat is None or lon is None:
+            return all(lat_v is not None for lat_v, _ in recente)
+        return all(lat_v is None or distanta_m(lat, lon, lat_v, lon_v) > self.raza_m for lat_v, lon_v in recente)
+
+    # Intoarce destinatarii care nu au atins limita de SMS-uri din ultima ora
+    def destinatari_permisi(self, numere, acum=None):
+        acum = time.time() if acum is None else acum
+        with self._lock:
+            trimise = dict(self._db.execute(f'SELECT numar, COUNT(*) FROM alerte WHERE timp > ? AND {CONDITIE_LIVRATA} '
+                                            'GROUP BY numar',
+                                            (acum - 3600, acum - self.timeout_livrare_s)).fetchall())
+        return [numar for numar in numere if trimise.get(numar, 0) < self.max_pe_ora]
+
+    # Adauga in jurnal alerta trimisa catre un destinatar si intoarce id-ul ei
+    def inregistreaza(self, lat, lon, numar, text, acum=None):
+        acum = time.time() if acum is None else acum
+        with self._lock:
+            cursor = self._db.execute('INSERT INTO alerte (timp, lat, lon, numar, text) VALUES (?, ?, ?, ?, ?)',
+                                      (acum, lat, lon, numar, text))
+            self._db.commit()
+        return cursor.lastrowid
+
+    # Completeaza rezultatul livrarii pentru alerta cu id-ul dat (apelat din firul dispecerului SMS)
+    def inregistreaza_rezultat(self, id_alerta, trimis, referinta=None, eroare=None):
+        if id_alerta is None:
+            return
+        with self._lock:
+            self._db.execute('UPDATE alerte SET trimis = ?, referinta = ?, eroare = ? WHERE id = ?',
+                             (int(trimis), referinta, eroare, id_alerta))
+            self._db.commit()
+
+    def inchide(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,143 @@
+# Motor de comenzi AT pentru modulul GSM (SIM800L)
+# Trimite o comanda si revine imediat ce apare codul final (OK / ERROR / +CME ERROR / +CMS ERROR)
+# sau promptul '>', cu timeout separat pentru fiecare comanda. Mesajele nesolicitate (URC: +CMTI,
+# +CMGS, RING) sunt transformate in evenimente. Functioneaza cu orice obiect compatibil serial.Serial
+# (port real, pty sau modem simulat).
+
+import queue             # Coada de evenimente URC
+import threading         # Lock: o singura comanda AT pe port la un moment dat
+import time              # Pentru timeout-ul fiecarei comenzi
+from collections import namedtuple
+
+# Raspunsul unei comenzi: liniile intermediare (fara ecou si fara URC) si codul final
+RaspunsAT = namedtuple('RaspunsAT', ['linii', 'final'])
+
+# Eveniment nesolicitat de la modul: tip ('CMTI', 'CMGS', 'RING') si restul liniei
+EvenimentURC = namedtuple('EvenimentURC', ['tip', 'date'])
+
+CODURI_FINALE_OK = (b'OK',)
+CODURI_FINALE_EROARE = (b'ERROR', b'+CME ERROR', b'+CMS ERROR', b'NO CARRIER', b'BUSY', b'NO ANSWER')
+PREFIXE_URC = {b'+CMTI:': 'CMTI', b'+CMGS:': 'CMGS', b'RING': 'RING'}
+
+MAX_EVENIMENTE = 100     # Cate evenimente pastreaza coada; cele mai vechi sunt eliminate
+
+
+class ErroareAT(RuntimeError):
+    pass
+
+
+# Pune un element intr-o coada limitata; daca este plina, elimina mai intai cel mai vechi element
+# (o coada pe care nu o citeste nimeni nu creste la nesfarsit pe o unitate care ruleaza luni intregi)
+def pune_cu_limita(coada, element):
+    while True:
+        try:
+            coada.put_nowait(element)
+            return
+        except queue.Full:
+            try:
+                coada.get_nowait()
+            except queue.Empty:
+                pass
+
+
+class ModemAT:
+    # ser: port serial deschis; la_urc: functie optionala apelata pentru fiecare EvenimentURC
+    def __init__(self, ser, la_urc=None):
+        self.ser = ser
+        self.la_urc = la_urc
+        self.evenimente = queue.Queue(maxsize=MAX_EVENIMENTE)
+        self.initializat = False
+        self._buffer = b''
+        self._lock = threading.Lock()
+
+    # Initializarea se face o singura data pe sesiune, nu la fiecare SMS
+    def initializeaza(self):
+        if self.initializat:
+            return
+        self.ser.reset_input_buffer()
+        self._buffer = b''
+        self.comanda('AT')
+        self.comanda('ATE0')          # Fara ecou: raspunsurile contin doar liniile modulului
+        self.comanda('AT+CMGF=1')     # Modul Text pentru SMS
+        self.initializat = True
+
+    # Trimite o comanda si asteapta codul final; intoarce RaspunsAT sau ridica ErroareAT
+    def comanda(self, cmd, timeout=2):
+        with self._lock:
+            self.ser.write(cmd.encode() + b'\r')
+            return self._asteapta_final(cmd.encode(), timeout)
+
+    # Trimite un SMS in modul text si intoarce referinta din '+CMGS: <ref>' (None daca lipseste sau este ilizibila)
+    def trimite_sms(self, numar, text, timeout=60):
+        self.initializeaza()
+        with self._lock:
+            self.ser.write(f'AT+CMGS="{numar}"\r'.encode())
+            self._asteapta_prompt(5)
+            self.ser.write(text.encode() + b'\x1A')   # Ctrl+Z pentru terminarea mesajului
+            raspuns = self._asteapta_final(None, timeout)
+        for linie in raspuns.linii:
+            if linie.startswith(b'+CMGS:'):
+                # Modulul a raspuns OK, deci SMS-ul a plecat; o referinta corupta nu este motiv de retrimitere
+                try:
+                    return int(linie.split(b':')[1].strip())
+                except ValueError:
+                    return None
+        return None
+
+    # Citeste ce a trimis modulul intre comenzi si transforma URC-urile in evenimente
+    def citeste_urc(self):
+        with self._lock:
+            if self.ser.in_waiting:
+                self._buffer += self.ser.read(self.ser.in_waiting)
+            while b'\r\n' in self._buffer:
+                linie, self._buffer = self._buffer.split(b'\r\n', 1)
+                self._este_urc(linie.strip())
+
+    def _asteapta_prompt(self, timeout):
+        limita = time.monotonic() + timeout
+        while True:
+            # Promptul '> ' nu este urmat de sfarsit de linie
+            if b'>' in self._buffer:
+                self._buffer = self._buffer.split(b'>', 1)[1].lstrip(b' ')
+                return
+            while b'\r\n' in self._buffer:
+                linie, self._buffer = self._buffer.split(b'\r\n', 1)
+                linie = linie.strip()
+                if linie.startswith(CODURI_FINALE_EROARE):
+                    raise ErroareAT(f'Eroare in loc de prompt: {linie.decode(errors="ignore")}')
+                self._este_urc(linie)
+            self._citeste(limita, 'prompt >')
+
+    def _asteapta_final(self, ecou, timeout):
+        limita = time.monotonic() + timeout
+        linii = []
+        while True:
+            while b'\r\n' in self._buffer:
+                linie, self._buffer = self._buffer.split(b'\r\n', 1)
+                linie = linie.strip()
+                if not linie or linie == ecou:
+                    continue
+                if linie in CODURI_FINALE_OK:
+                    return RaspunsAT(linii, linie)
+                if linie.startswith(CODURI_FINALE_EROARE):
+                    raise ErroareAT(f'{ecou.decode() if ecou else "SMS"}: {linie.decode(errors="ignore")}')
+                # +CMGS este si raspuns la comanda, dar se semnaleaza si ca eveniment
+                if self._este_urc(linie) and not linie.startswith(b'+CMGS:'):
+                    continue
+                linii.append(linie)
+            self._citeste(limita, ecou.decode() if ecou else 'SMS')
+
+    def _citeste(self, limita, ce):
+        if time.monotonic() >= limita:
+            raise ErroareAT(f'Timeout la asteptarea raspunsului pentru {ce}')
+        self._buffer += self.ser.read(self.ser.in_waiting or 1)
+
+    def _este_urc(self, linie):
+        for prefix, tip in PREFIXE_URC.items():
+            if linie.startswith(prefix):
+                eveniment = EvenimentURC(tip, linie[len(prefix):].strip().decode(errors='ignore'))
+                pune_cu_limita(self.evenimente, eveniment)
+                if self.la_urc:
+                    self.la_urc(eveniment)
+                return True
+        return False
@@ -0,0 +1,88 @@
+# Alegerea backend-ului de inferenta pentru modelul YOLO
+# Pe langa modelul PyTorch (best.pt), export_model.py poate pregati variante optimizate pentru CPU
+# (ONNX Runtime, OpenVINO, NCNN, optional INT8) salvate langa model. La pornire se cauta aceste
+# variante, se masoara rapid fiecare backend disponibil si se pastreaza cel mai rapid.
+
+import os                # Pentru verificarea fisierelor exportate
+import json              # Pentru fisierul YAML de date (JSON este YAML valid)
+import time              # Pentru masurarea vitezei fiecarui backend
+import importlib.util    # Pentru a verifica daca runtime-ul unui backend este instalat
+
+import numpy as np       # Pentru frame-ul de test folosit la masurare
+from ultralytics import YOLO
+
+# Numele backend-ului, sufixul fisierului exportat fata de modelul .pt si pachetul necesar la rulare
+BACKENDURI = [
+    ('ncnn', '_ncnn_model', 'ncnn'),
+    ('openvino_int8', '_int8_openvino_model', 'openvino'),
+    ('openvino', '_openvino_model', 'openvino'),
+    ('onnx_int8', '_int8.onnx', 'onnxruntime'),
+    ('onnx', '.onnx', 'onnxruntime'),
+]
+
+
+# Backend-urile care accepta mai multe imagini intr-un apel; exporturile ONNX si NCNN au lotul fix 1
+BACKENDURI_CU_LOT = ('pytorch', 'openvino', 'openvino_int8')
+
+
+# Intoarce lista (nume_backend, cale) cu variantele modelului care exista si pot rula pe acest sistem
+def artefacte_disponibile(model_path):
+    baza, ext = os.path.splitext(model_path)
+    if ext != '.pt':
+        # Modelul dat este deja un export (ex. best.onnx sau best_ncnn_model); se foloseste direct
+        return [('exportat', model_path)]
+    candidati = [('pytorch', model_path)]
+    for nume, sufix, pachet in BACKENDURI:
+        cale = baza + sufix
+        if os.path.exists(cale) and importlib.util.find_spec(pachet) is not None:
+            candidati.append((nume, cale))
+    return candidati
+
+
+# Masoara timpul mediu de inferenta (ms) pe un frame de test de marimea imgsz
+def masoara_viteza(model, imgsz=640, repetari=5):
+    frame = np.zeros((imgsz, imgsz, 3), dtype=np.uint8)
+    for _ in range(2):
+        model(frame, imgsz=imgsz, verbose=False)   # Incalzire: prima inferenta include initializarea
+    t_start = time.perf_counter()
+    for _ in range(repetari):
+        model(frame, imgsz=imgsz, verbose=False)
+    return (time.perf_counter() - t_start) / repetari * 1000
+
+
+# Incarca modelul pe backend-ul cerut sau, pentru 'auto', pe cel mai rapid backend disponibil.
+# Intoarce (nume_backend, model) sau (None, None) daca backend-ul cerut nu a fost exportat.
+def incarca_model(model_path, backend='auto', imgsz=640):
+    candidati = artefacte_disponibile(model_path)
+    if backend != 'auto':
+        candidati = [(nume, cale) for nume, cale in candidati if nume == backend]
+        if not candidati:
+            return None, None
+    if len(candidati) == 1:
+        nume, cale = candidati[0]
+        return nume, YOLO(cale, task='detect')
+
+    cel_mai_bun = None
+    for nume, cale in candidati:
+        model = YOLO(cale, task='detect')
+        durata = masoara_viteza(model, imgsz)
+        print(f'Backend {nume}: {durata:.1f} ms/frame')
+        if cel_mai_bun is None or durata < cel_mai_bun[0]:
+            cel_mai_bun = (durata, nume, model)
+    print(f'Backend ales: {cel_mai_bun[1]}')
+    return cel_mai_bun[1], cel_mai_bun[2]
+
+
+# Scrie fisierul de date folosit pentru calibrarea INT8 si pentru validare: imaginile din
+# data/validation/images create de split_images.py si numele claselor modelului
+def scrie_yaml_validare(cale_date, labels, cale_yaml):
+    date = {
+        'path': os.path.abspath(cale_date),
+        'train': 'validation/images',
+        'val': 'validation/images',
+        'nc': len(labels),
+        'names': [labels[i] for i in sorted(labels)],
+    }
+    with open(cale_yaml, 'w') as f:
+        json.dump(date, f, indent=2)
+    return cale_yaml
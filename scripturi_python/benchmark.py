@@ -0,0 +1,136 @@
+# Benchmark al intregului lant de detectie, cu latenta pe fiecare etapa
+# Ruleaza chiar detectorul (detect_final.py) pe un set fix de imagini, foldere si/sau videoclipuri, fara afisare,
+# cu GPS si GSM simulate (serial_replay.py) si cu --profile, deci planificatorul, filtrul de miscare, ROI-ul,
+# tile-urile, tracker-ul si suprimarea alertelor sunt masurate exact cum ruleaza pe dispozitiv. Argumentele pe
+# care benchmark-ul nu le cunoaste (de exemplu --motion 0.01 --roi roi.json --tile 640) sunt date detectorului.
+# Raportul (p50/p95/p99 pe etapa si throughput-ul total) este salvat ca JSON, pentru comparatii intre modele,
+# rezolutii, backend-uri si optiuni ale detectorului.
+
+import os                # Pentru operatii cu sistemul de fisiere
+import sys               # Pentru interpretorul Python si terminarea programului
+import json              # Pentru profilul detectorului si raport
+import sqlite3           # Pentru numarul de alerte din jurnalul detectorului
+import argparse          # Pentru parsarea argumentelor din linia de comanda
+import platform          # Pentru descrierea sistemului in raport
+import subprocess        # Detectorul ruleaza ca proces separat, la fel ca pe dispozitiv
+import tempfile          # Fiecare rulare are propriul jurnal de alerte si propriul profil
+
+import numpy as np       # Pentru percentile
+
+# Etapele buclei, in ordinea in care sunt masurate de ProfilEtape in detector
+ETAPE = ['captura', 'redimensionare', 'inferenta', 'postprocesare', 'alerta', 'desenare', 'afisare']
+DETECTOR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'detect_final.py')
+
+# Defineste si parseaza argumentele introduse de utilizator
+parser = argparse.ArgumentParser()
+parser.add_argument('--model', help='Calea catre modelul YOLO (exemplu: "best.pt")', required=True)
+parser.add_argument('--source', help='Imagini, foldere de imagini sau videoclipuri, separate prin virgula', required=True)
+parser.add_argument('--backend', help='Backend de inferenta (auto, pytorch, onnx, openvino, ncnn...)', default='auto')
+parser.add_argument('--thresh', help='Prag minim de incredere', default=0.5)
+parser.add_argument('--resolution', help='Rezolutia WxH la care se redimensioneaza frame-urile (exemplu: "640x480")', default=None)
+parser.add_argument('--repeat', help='De cate ori se parcurge setul de surse', default=1)
+parser.add_argument('--warmup', help='Cate frame-uri de la inceputul fiecarei rulari nu intra in statistici', default=5)
+parser.add_argument('--gps_port', help='Portul GPS folosit la benchmark (implicit GPS simulat)', default='sim:gps@10')
+parser.add_argument('--gsm_port', help='Portul GSM folosit la benchmark (implicit modul simulat)', default='sim:modem@50')
+parser.add_argument('--detector', help='Scriptul de detectie masurat (implicit detect_final.py)', default=DETECTOR)
+parser.add_argument('--raport', help='Fisierul JSON in care se salveaza rezultatele', default='raport_benchmark.json')
+args, optiuni_detector = parser.parse_known_args()
+
+if not os.path.exists(args.model):
+    print('EROARE: Calea catre model este invalida sau modelul nu a fost gasit.')
+    sys.exit(0)
+surse = [sursa for sursa in args.source.split(',') if sursa]
+for sursa in surse:
+    if not os.path.exists(sursa):
+        print(f'Sursa {sursa} nu exista.')
+        sys.exit(0)
+
+# Detectorul ruleaza in folderul temporar al rularii (acolo scrie capturile si clipurile alertelor),
+# deci caile date ca argumente sunt transformate in cai absolute
+optiuni_detector = [os.path.abspath(optiune) if os.path.exists(optiune) else optiune for optiune in optiuni_detector]
+
+
+# Ruleaza detectorul pe o sursa si intoarce (informatiile profilului, frame-urile profilate, numarul de alerte)
+def ruleaza_detector(sursa):
+    with tempfile.TemporaryDirectory() as folder:
+        cale_profil = os.path.join(folder, 'profil.jsonl')
+        cale_alerte = os.path.join(folder, 'alerte.db')
+        comanda = [sys.executable, os.path.abspath(args.detector), '--model', os.path.abspath(args.model),
+                   '--source', os.path.abspath(sursa), '--headless', '--thresh', str(args.thresh),
+                   '--backend', args.backend, '--gps_port', args.gps_port, '--gsm_port', args.gsm_port,
+                   '--recipients', '+40700000000', '--alert_db', cale_alerte, '--profile', cale_profil]
+        if args.resolution is not None:
+            comanda += ['--resolution', args.resolution]
+        rulare = subprocess.run(comanda + optiuni_detector, cwd=folder, capture_output=True, text=True)
+        if rulare.returncode != 0 or not os.path.exists(cale_profil):
+            print(f'EROARE: detectorul s-a oprit pe sursa {sursa}:')
+            print(rulare.stdout[-2000:] + rulare.stderr[-2000:])
+            sys.exit(0)
+        with open(cale_profil) as f:
+            randuri = [json.loads(linie) for linie in f]
+        with sqlite3.connect(cale_alerte) as db:
+            alerte = db.execute('SELECT COUNT(*) FROM alerte').fetchone()[0]
+    return randuri[0], randuri[1:], alerte
+
+
+masuratori = {etapa: [] for etapa in ETAPE}
+total_frame = []
+frame_uri_cu_inferenta = 0
+alerte = 0
+numar_frame = 0
+backend = None
+for _ in range(int(args.repeat)):
+    for sursa in surse:
+        informatii, frame_uri, alerte_sursa = ruleaza_detector(sursa)
+        backend = informatii.get('backend')
+        alerte += alerte_sursa
+        numar_frame += len(frame_uri)
+        # Primele frame-uri ale fiecarei rulari includ initializarea modelului si nu intra in statistici
+        for frame in frame_uri[int(args.warmup):]:
+            etape = frame['etape']
+            for etapa in ETAPE:
+                # Inferenta se masoara doar pe frame-urile pe care a rulat modelul
+                if etapa in etape and (etapa != 'inferenta' or frame['detectie']):
+                    masuratori[etapa].append(etape[etapa])
+            frame_uri_cu_inferenta += frame['detectie']
+            total_frame.append(sum(etape.values()))
+
+if not total_frame:
+    print(f'Prea putine frame-uri ({numar_frame}) pentru --warmup {args.warmup}; foloseste foldere sau videoclipuri.')
+    sys.exit(0)
+
+
+# p50/p95/p99, media si maximul in milisecunde
+def statistici(valori):
+    valori = np.asarray(valori)
+    p50, p95, p99 = np.percentile(valori, [50, 95, 99])
+    return {'p50_ms': round(float(p50), 3), 'p95_ms': round(float(p95), 3), 'p99_ms': round(float(p99), 3),
+            'medie_ms': round(float(valori.mean()), 3), 'max_ms': round(float(valori.max()), 3)}
+
+
+raport = {
+    'model': args.model,
+    'backend': backend,
+    'rezolutie': args.resolution,
+    'surse': surse,
+    'detector': os.path.basename(args.detector),
+    'optiuni_detector': optiuni_detector,
+    'sistem': f'{platform.system()} {platform.machine()} ({platform.processor() or "procesor necunoscut"})',
+    'frame_uri': len(total_frame),
+    'frame_uri_cu_inferenta': frame_uri_cu_inferenta,
+    'alerte': alerte,
+    'fps': round(len(total_frame) / (sum(total_frame) / 1000), 2),
+    'etape': {etapa: statistici(masuratori[etapa]) for etapa in ETAPE
+              if masuratori[etapa] and not (etapa == 'redimensionare' and args.resolution is None)},
+    'total': statistici(total_frame),
+}
+
+print(f'\nBackend {backend}, {raport["frame_uri"]} frame-uri ({frame_uri_cu_inferenta} cu inferenta), '
+      f'{raport["fps"]} FPS, {alerte} alerte')
+print(f'{"Etapa":<16}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}')
+for etapa, s in list(raport['etape'].items()) + [('total', raport['total'])]:
+    print(f'{etapa:<16}{s["p50_ms"]:>10.2f}{s["p95_ms"]:>10.2f}{s["p99_ms"]:>10.2f}')
+
+with open(args.raport, 'w') as f:
+    json.dump(raport, f, indent=2)
+print(f'\nRaportul a fost salvat la {args.raport}')
@@ -0,0 +1,76 @@
+# Raport comparativ pentru variantele exportate ale modelului YOLO
+# Pentru fiecare backend disponibil (PyTorch, ONNX, OpenVINO, NCNN, INT8) ruleaza validarea pe
+# data/validation/images si afiseaza viteza (ms/imagine, FPS) alaturi de precizie si recall pentru urs,
+# ca sa se verifice ca accelerarea nu reduce detectia ursilor.
+
+import os                # Pentru operatii cu sistemul de fisiere
+import sys               # Pentru terminarea programului in caz de eroare
+import json              # Pentru salvarea raportului
+import argparse          # Pentru parsarea argumentelor din linia de comanda
+
+from ultralytics import YOLO
+
+from backend import artefacte_disponibile, scrie_yaml_validare
+from postprocesare import indici_clasa
+
+# Defineste si parseaza argumentele introduse de utilizator
+parser = argparse.ArgumentParser()
+parser.add_argument('--model', help='Calea catre modelul PyTorch (exemplu: "best.pt"); variantele exportate sunt cautate langa el',
+                    required=True)
+parser.add_argument('--data', help='Folderul cu datasetul impartit de split_images.py (exemplu: "data")', default='data')
+parser.add_argument('--imgsz', help='Rezolutia de intrare folosita la export (exemplu: "640")', default=640)
+parser.add_argument('--clasa', help='Clasa pentru care se raporteaza recall-ul (exemplu: "urs")', default='urs')
+parser.add_argument('--raport', help='Fisierul JSON in care se salveaza raportul', default='raport_backend.json')
+args = parser.parse_args()
+
+model_path = args.model
+data_path = args.data
+imgsz = int(args.imgsz)
+
+if not os.path.exists(model_path):
+    print('EROARE: Calea catre model este invalida sau modelul nu a fost gasit.')
+    sys.exit(0)
+if not os.path.isdir(os.path.join(data_path, 'validation', 'images')):
+    print(f'Nu exista folderul {data_path}/validation/images. Ruleaza mai intai split_images.py.')
+    sys.exit(0)
+
+labels = YOLO(model_path, task='detect').names
+clase = indici_clasa(labels, args.clasa)
+cale_yaml = scrie_yaml_validare(data_path, labels, 'validare_backend.yaml')
+
+raport = []
+for nume, cale in artefacte_disponibile(model_path):
+    print(f'Validare backend {nume} ({cale})...')
+    model = YOLO(cale, task='detect')
+    metrici = model.val(data=cale_yaml, imgsz=imgsz, batch=1, plots=False, verbose=False)
+
+    # Precizia si recall-ul pentru clasa urmarita (daca apare in setul de validare)
+    p_clasa, r_clasa = None, None
+    indici_validare = list(metrici.box.ap_class_index)
+    if clase and clase[0] in indici_validare:
+        p_clasa, r_clasa, _, _ = metrici.box.class_result(indici_validare.index(clase[0]))
+
+    ms_imagine = sum(metrici.speed.values())
+    raport.append({
+        'backend': nume,
+        'cale': cale,
+        'ms_inferenta': round(metrici.speed['inference'], 2),
+        'ms_total': round(ms_imagine, 2),
+        'fps': round(1000 / ms_imagine, 2) if ms_imagine else None,
+        'map50': round(float(metrici.box.map50), 4),
+        f'precizie_{args.clasa}': None if p_clasa is None else round(float(p_clasa), 4),
+        f'recall_{args.clasa}': None if r_clasa is None else round(float(r_clasa), 4),
+    })
+
+# Afiseaza tabelul comparativ, cu diferenta de recall fata de modelul PyTorch
+referinta = raport[0][f'recall_{args.clasa}']
+print(f'\n{"Backend":<15}{"ms/img":>9}{"FPS":>8}{"mAP50":>8}{"Recall " + args.clasa:>14}{"Dif.":>8}')
+for r in raport:
+    recall = r[f'recall_{args.clasa}']
+    diferenta = '' if recall is None or referinta is None else f'{recall - referinta:+.3f}'
+    print(f'{r["backend"]:<15}{r["ms_total"]:>9.1f}{r["fps"] or 0:>8.1f}{r["map50"]:>8.3f}'
+          f'{"-" if recall is None else f"{recall:.3f}":>14}{diferenta:>8}')
+
+with open(args.raport, 'w') as f:
+    json.dump(raport, f, indent=2)
+print(f'\nRaportul a fost salvat la {args.raport}')
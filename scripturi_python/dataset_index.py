@@ -0,0 +1,228 @@
+# Indexarea si validarea datasetului inainte de antrenare
+# Imaginile si adnotarile din fiecare set (train, validation...) sunt verificate in paralel: imagini care nu pot fi
+# citite, adnotari fara imagine, linii care nu au formatul YOLO, clase >= nc din classes.txt si box-uri
+# nenormalizate sau in afara imaginii. Fara classes.txt scriptul se opreste, deoarece clasele nu pot fi verificate.
+# Rezultatul fiecarui fisier este pastrat in index impreuna cu mtime si
+# marimea fisierelor, deci la o noua rulare sunt verificate doar fisierele noi sau modificate. La final sunt
+# afisate histogramele claselor si ale marimii box-urilor, iar indexul poate fi folosit de create_data_yaml.
+
+import os                # Pentru parcurgerea folderelor
+import sys               # Pentru codul de iesire
+import json              # Pentru fisierul index
+import time              # Pentru durata indexarii
+import argparse          # Pentru parsarea argumentelor din linia de comanda
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor  # Verificarea fisierelor ruleaza in paralel
+
+import cv2               # Pentru verificarea imaginilor
+
+img_ext_list = ['.jpg','.JPG','.jpeg','.JPEG','.png','.PNG','.bmp','.BMP']
+VERSIUNE_INDEX = 1
+TOLERANTA = 1e-3         # Box-urile pot depasi marginea imaginii cu cel mult atat (erori de rotunjire)
+# Limitele histogramei marimii box-urilor: sqrt(latime * inaltime), ca fractiune din imagine
+LIMITE_MARIME = [0.02, 0.05, 0.1, 0.2, 0.4]
+
+
+# Seturile datasetului: subfolderele care contin images (train, validation...) sau radacina insasi
+def cauta_seturi(radacina):
+    if os.path.isdir(os.path.join(radacina, 'images')):
+        return {'.': radacina}
+    return {nume: os.path.join(radacina, nume) for nume in sorted(os.listdir(radacina))
+            if os.path.isdir(os.path.join(radacina, nume, 'images'))}
+
+
+def citeste_clase(cale):
+    with open(cale) as f:
+        return [linie.strip() for linie in f if linie.strip()]
+
+
+# Semnatura unui fisier pentru cache: (mtime, marime), sau None daca fisierul lipseste
+def semnatura(cale):
+    if cale is None:
+        return None
+    st = os.stat(cale)
+    return [st.st_mtime_ns, st.st_size]
+
+
+# Citeste o adnotare YOLO si intoarce box-urile [clasa, x, y, w, h] si erorile gasite
+def valideaza_adnotare(cale):
+    box_uri, erori = [], []
+    with open(cale) as f:
+        linii = f.read().splitlines()
+    for nr, linie in enumerate(linii, start=1):
+        parti = linie.split()
+        if not parti:
+            continue
+        if len(parti) != 5:
+            erori.append(f'linia {nr}: {len(parti)} valori in loc de 5 (clasa x y w h)')
+            continue
+        try:
+            clasa = int(parti[0])
+            x, y, w, h = (float(v) for v in parti[1:])
+        except ValueError:
+            erori.append(f'linia {nr}: valori care nu sunt numere')
+            continue
+        if clasa < 0:
+            erori.append(f'linia {nr}: clasa negativa {clasa}')
+        elif w <= 0 or h <= 0:
+            erori.append(f'linia {nr}: box cu latime sau inaltime nula')
+        elif max(x, y, w, h) > 1 + TOLERANTA or min(x, y) < -TOLERANTA:
+            erori.append(f'linia {nr}: coordonate nenormalizate (trebuie sa fie in [0, 1])')
+        elif x - w / 2 < -TOLERANTA or y - h / 2 < -TOLERANTA or x + w / 2 > 1 + TOLERANTA or y + h / 2 > 1 + TOLERANTA:
+            erori.append(f'linia {nr}: box in afara imaginii')
+        else:
+            box_uri.append([clasa, x, y, w, h])
+    return box_uri, erori
+
+
+# Verifica o imagine si adnotarea ei; imaginea este decodata la 1/8, suficient ca sa se vada daca este corupta
+def indexeaza_fisier(img_path, txt_path):
+    intrare = {'adnotare': txt_path, 'semnatura': [semnatura(img_path), semnatura(txt_path)],
+               'box': [], 'erori': []}
+    if cv2.imread(img_path, cv2.IMREAD_REDUCED_GRAYSCALE_8) is None:
+        intrare['erori'].append('imaginea nu poate fi citita')
+    if txt_path is not None:
+        intrare['box'], erori = valideaza_adnotare(txt_path)
+        intrare['erori'] += erori
+    return intrare
+
+
+# Indexeaza toate seturile; intrarile din indexul anterior cu aceeasi semnatura sunt refolosite
+def indexeaza(radacina, clase, index_anterior=None, workers=8):
+    fisiere_vechi = (index_anterior or {}).get('fisiere', {})
+    fisiere, seturi, orfane = {}, {}, []
+    de_verificat = []
+    for nume_set, folder in cauta_seturi(radacina).items():
+        folder_img, folder_txt = os.path.join(folder, 'images'), os.path.join(folder, 'labels')
+        adnotari = {os.path.splitext(f)[0]: os.path.join(folder_txt, f)
+                    for f in (os.listdir(folder_txt) if os.path.isdir(folder_txt) else []) if f.endswith('.txt')}
+        imagini = sorted(os.path.join(folder_img, f) for f in os.listdir(folder_img) if os.path.splitext(f)[1] in img_ext_list)
+        folosite = set()
+        for img_path in imagini:
+            baza = os.path.splitext(os.path.basename(img_path))[0]
+            txt_path = adnotari.get(baza)
+            folosite.add(baza)
+            vechi = fisiere_vechi.get(img_path)
+            if vechi is not None and vechi['adnotare'] == txt_path and \
+                    vechi['semnatura'] == [semnatura(img_path), semnatura(txt_path)]:
+                fisiere[img_path] = vechi
+            else:
+                de_verificat.append((img_path, txt_path))
+        orfane += [adnotari[baza] for baza in sorted(set(adnotari) - folosite)]
+        seturi[nume_set] = {'folder': folder, 'imagini': len(imagini)}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for (img_path, _), intrare in zip(de_verificat, executor.map(lambda p: indexeaza_fisier(*p), de_verificat)):
+            fisiere[img_path] = intrare
+
+    for nume_set in seturi:
+        folder = seturi[nume_set]['folder']
+        seturi[nume_set]['statistici'] = statistici([fisiere[p] for p in fisiere if p.startswith(folder + os.sep)],
+                                                    len(clase))
+    return {'versiune': VERSIUNE_INDEX, 'radacina': os.path.abspath(radacina), 'clase': clase,
+            'nc': len(clase), 'seturi': seturi, 'orfane': orfane,
+            'fisiere': fisiere, 'verificate': len(de_verificat)}
+
+
+# Histogramele unui set si erorile lui, calculate din index (fara recitirea fisierelor)
+def statistici(intrari, nc):
+    imagini_pe_clasa, box_pe_clasa, marimi = Counter(), Counter(), [0] * (len(LIMITE_MARIME) + 1)
+    fundal, erori, clase_invalide = 0, 0, 0
+    for intrare in intrari:
+        erori += len(intrare['erori']) > 0
+        if not intrare['box']:
+            fundal += 1
+        imagini_pe_clasa.update(set(box[0] for box in intrare['box']))
+        for clasa, _, _, w, h in intrare['box']:
+            box_pe_clasa[clasa] += 1
+            if clasa >= nc:
+                clase_invalide += 1
+            marime = (w * h) ** 0.5
+            marimi[sum(marime >= limita for limita in LIMITE_MARIME)] += 1
+    return {'imagini_pe_clasa': {str(c): n for c, n in sorted(imagini_pe_clasa.items())},
+            'box_pe_clasa': {str(c): n for c, n in sorted(box_pe_clasa.items())},
+            'marime_box': marimi, 'fundal': fundal, 'imagini_cu_erori': erori, 'box_clasa_invalida': clase_invalide}
+
+
+# Afiseaza o histograma ca bare de text
+def afiseaza_histograma(titlu, valori):
+    print(titlu)
+    maxim = max(list(valori.values()) + [1])
+    for eticheta, n in valori.items():
+        print(f'  {eticheta:>12} {n:8d} {"#" * round(40 * n / maxim)}')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--datapath', help='Folderul datasetului: cu subfoldere train/validation (fiecare cu images si labels) \
+                        sau direct cu images si labels', required=True)
+    parser.add_argument('--classes', help='Fisierul classes.txt (implicit <datapath>/classes.txt, copiat acolo de split_images.py)',
+                        default=None)
+    parser.add_argument('--index', help='Fisierul index, folosit si drept cache (implicit <datapath>/dataset_index.json)',
+                        default=None)
+    parser.add_argument('--workers', help='Numarul de fire pentru verificarea fisierelor (implicit 8)', default=8)
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.datapath):
+        print(f'Folderul {args.datapath} nu exista.')
+        sys.exit(0)
+    cale_clase = args.classes or os.path.join(args.datapath, 'classes.txt')
+    if not os.path.exists(cale_clase):
+        print(f'EROARE: fisierul {cale_clase} nu a fost gasit; fara el clasele din adnotari nu pot fi comparate cu nc. '
+              f'Foloseste --classes sau imparte datasetul cu split_images.py, care copiaza classes.txt in folderul de iesire.')
+        sys.exit(1)
+    clase = citeste_clase(cale_clase)
+    cale_index = args.index or os.path.join(args.datapath, 'dataset_index.json')
+
+    # Indexul anterior este folosit ca cache doar daca are aceeasi versiune
+    index_anterior = None
+    if os.path.exists(cale_index):
+        with open(cale_index) as f:
+            index_anterior = json.load(f)
+        if index_anterior.get('versiune') != VERSIUNE_INDEX:
+            index_anterior = None
+
+    t_start = time.perf_counter()
+    index = indexeaza(args.datapath, clase, index_anterior, int(args.workers))
+    if not index['seturi']:
+        print(f'Nu a fost gasit niciun folder images in {args.datapath}.')
+        sys.exit(0)
+    print(f'{len(index["fisiere"])} imagini indexate in {time.perf_counter() - t_start:.1f} s '
+          f'({index["verificate"]} verificate, restul din cache).')
+
+    # Raportul pe seturi: histogramele claselor si ale marimii box-urilor
+    nume_clase = lambda c: clase[int(c)] if int(c) < len(clase) else f'clasa {c}'
+    etichete_marime = ['<' + str(LIMITE_MARIME[0])] + \
+                      [f'{a}-{b}' for a, b in zip(LIMITE_MARIME, LIMITE_MARIME[1:])] + ['>=' + str(LIMITE_MARIME[-1])]
+    for nume_set, info in index['seturi'].items():
+        st = info['statistici']
+        print(f'\nSetul {nume_set}: {info["imagini"]} imagini, {st["fundal"]} background')
+        afiseaza_histograma('Imagini pe clasa:', {nume_clase(c): n for c, n in st['imagini_pe_clasa'].items()})
+        afiseaza_histograma('Box-uri pe clasa:', {nume_clase(c): n for c, n in st['box_pe_clasa'].items()})
+        afiseaza_histograma('Marimea box-urilor (fractiune din imagine):', dict(zip(etichete_marime, st['marime_box'])))
+
+    # Erorile: fisierele cu probleme, adnotarile fara imagine si clasele >= nc
+    probleme = [(p, e) for p, intrare in index['fisiere'].items() for e in intrare['erori']]
+    probleme += [(p, f'clasa {box[0]} >= nc ({index["nc"]})') for p, intrare in index['fisiere'].items()
+                 for box in intrare['box'] if box[0] >= index['nc']]
+    probleme += [(p, 'adnotare fara imagine') for p in index['orfane']]
+    index['probleme'] = len(probleme)
+
+    tmp = cale_index + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp, cale_index)
+    print(f'\nIndexul a fost salvat la {cale_index}')
+
+    if probleme:
+        print(f'EROARE: {len(probleme)} probleme in dataset:')
+        for cale, problema in probleme[:20]:
+            print(f'  {cale}: {problema}')
+        if len(probleme) > 20:
+            print(f'  ... si inca {len(probleme) - 20}')
+        sys.exit(1)
+    print('Datasetul este valid.')
+
+
+if __name__ == '__main__':
+    main()
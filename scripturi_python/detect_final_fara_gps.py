@@ -3,11 +3,24 @@ import sys
 import argparse
 import glob
 import time
+import signal
 import cv2
 import numpy as np
-from ultralytics import YOLO
-import serial
-import pynmea2
+from serial_replay import deschide_port
+from gps_reader import GpsReader
+from sms_dispatcher import SmsDispatcher, citeste_destinatari, afiseaza_rezultat
+from frame_capture import FrameCapture, citire_videocapture
+from backend import incarca_model, BACKENDURI_CU_LOT
+from postprocesare import extrage_detectii, indici_clasa, deseneaza_detectii, detectii_goale
+from tiling import detecteaza_pe_tile, scaleaza_boxes
+from roi import ZonaInteres
+from prefetch import ImagePrefetcher
+from motion_gate import MotionGate
+from scheduler import InferenceScheduler
+from metrics import Metrici, ServerMetrici, FisierMetrici, ProfilEtape
+from tracker import BearTracker
+from event_recorder import EventRecorder
+from alert_dedup import AlertSuppressor
 
 # ------------------- PARSARE ARGUMENTE -------------------
 parser = argparse.ArgumentParser()
@@ -15,7 +28,34 @@ parser.add_argument('--model', help='Calea catre modelul YOLO', required=True)
 parser.add_argument('--source', help='Sursa imaginilor sau video', required=True)
 parser.add_argument('--thresh', help='Prag minim de incredere', default=0.8)
 parser.add_argument('--resolution', help='Rezolutia WxH de afisare', default=None)
+parser.add_argument('--clip', help='Salveaza in folderul clipuri/ cate un clip pentru fiecare urs confirmat, cu secundele dinainte si de dupa', action='store_true')
+parser.add_argument('--pre_roll', help='Cu --clip, cate secunde dinaintea confirmarii sunt pastrate in memorie (implicit 5)', default=5)
+parser.add_argument('--post_roll', help='Cu --clip, cate secunde se inregistreaza dupa confirmare (implicit 10)', default=10)
+parser.add_argument('--clip_fps', help='Cu --clip, cate frame-uri pe secunda sunt pastrate in clip (implicit 10)', default=10)
 parser.add_argument('--record', help='Inregistreaza rezultatele ca demo1.avi', action='store_true')
+parser.add_argument('--tile', help='Doar pentru imagini/foldere: ruleaza detectia pe tile-uri de NxN pixeli din imaginea originala (ex. 640)', default=None)
+parser.add_argument('--tile_overlap', help='Cu --tile, suprapunerea dintre tile-uri vecine (0-1, implicit 0.2)', default=0.2)
+parser.add_argument('--roi', help='Fisier JSON cu zona de interes si zonele excluse ale camerei (vezi readme_roi.txt)', default=None)
+parser.add_argument('--prefetch', help='Doar pentru foldere: cate imagini sunt decodate in avans pe fire separate (0 = dezactivat, implicit 4)', default=4)
+parser.add_argument('--motion', help='Ruleaza YOLO doar cand scena se schimba; valoarea este fractiunea minima de pixeli schimbati (ex. 0.01)', default=None)
+parser.add_argument('--keepalive', help='Cu --motion, ruleaza oricum YOLO la fiecare K frame-uri (implicit 30)', default=30)
+parser.add_argument('--infer_every', help='Ruleaza YOLO doar la fiecare N frame-uri; intre ele se pastreaza ultimele detectii', default=1)
+parser.add_argument('--infer_hz', help='Mod adaptiv: cate detectii pe secunda in repaus; dupa un urs detectia ruleaza pe fiecare frame', default=None)
+parser.add_argument('--confirm', help='Alerta doar dupa ce ursul este vazut in K din ultimele M detectii, format K/M (implicit 3/5)', default='3/5')
+parser.add_argument('--recipients', help='Destinatarii alertelor: fisier JSON cu lista de numere sau numere separate prin virgula', default='destinatari.json')
+parser.add_argument('--alert_radius', help='Alertele la mai putin de R metri de o alerta recenta sunt suprimate (implicit 200)', default=200)
+parser.add_argument('--alert_cooldown', help='Cate secunde se suprima alertele din aceeasi zona (implicit 900)', default=900)
+parser.add_argument('--alert_max_hour', help='Numarul maxim de SMS-uri pe ora pentru fiecare destinatar (implicit 5)', default=5)
+parser.add_argument('--alert_db', help='Jurnalul persistent al alertelor (SQLite)', default='alerte.db')
+parser.add_argument('--gps_port', help='Portul GPS: cale (/dev/ttyAMA3), replay:captura.jsonl[@viteza] sau sim:gps / sim:gps_fara_fix', default='/dev/ttyAMA3')
+parser.add_argument('--gsm_port', help='Portul GSM: cale (/dev/ttyAMA0), replay:captura.jsonl[@viteza] sau sim:modem / sim:modem_eroare', default='/dev/ttyAMA0')
+parser.add_argument('--serial_log', help='Salveaza traficul serial in <prefix>_gps.jsonl si <prefix>_gsm.jsonl, pentru redare ulterioara', default=None)
+parser.add_argument('--backend', help='Backend de inferenta: auto (cel mai rapid), pytorch, onnx, onnx_int8, openvino, openvino_int8 sau ncnn', default='auto')
+parser.add_argument('--metrics_port', help='Porneste serverul HTTP de metrici (/metrics in format Prometheus, /health) pe acest port', default=None)
+parser.add_argument('--metrics_bind', help='Adresa serverului de metrici (implicit 127.0.0.1, doar local; 0.0.0.0 il expune in retea)', default='127.0.0.1')
+parser.add_argument('--metrics_file', help='Rescrie periodic metricile in acest fisier (format Prometheus)', default=None)
+parser.add_argument('--headless', help='Ruleaza fara afisare si fara adnotarea frame-urilor (ex. pe Raspberry Pi fara monitor)', action='store_true')
+parser.add_argument('--profile', help='Scrie durata fiecarei etape, pe frame, in acest fisier JSONL (folosit de benchmark.py)', default=None)
 args = parser.parse_args()
 
 model_path = args.model
@@ -23,36 +63,70 @@ img_source = args.source
 min_thresh = float(args.thresh)
 user_res = args.resolution
 record = args.record
+headless = args.headless
 
 # ------------------- INITIALIZARE YOLO -------------------
 if not os.path.exists(model_path):
     print('ERROR: Model path is invalid sau modelul nu exista.')
     sys.exit(0)
-model = YOLO(model_path, task='detect')
+backend, model = incarca_model(model_path, args.backend)
+if model is None:
+    print(f'Backend-ul {args.backend} nu a fost exportat pentru acest model sau runtime-ul nu este instalat. Ruleaza export_model.py.')
+    sys.exit(0)
 labels = model.names
+clase_urs = indici_clasa(labels, 'urs')   # Indicii claselor "urs" din labelmap
 
 # ------------------- INITIALIZARE GPS & GSM -------------------
 
-gps_ser = serial.Serial('/dev/ttyAMA3', 9600, timeout=1)     # Port GPS
-gsm_ser = serial.Serial('/dev/ttyAMA0', 9600, timeout=2)     # Port GSM
+# Capturile traficului serial, daca s-a cerut --serial_log
+log_gps = f'{args.serial_log}_gps.jsonl' if args.serial_log else None
+log_gsm = f'{args.serial_log}_gsm.jsonl' if args.serial_log else None
+gps_ser = deschide_port(args.gps_port, 9600, timeout=1, inregistrare=log_gps)     # Port GPS
+gsm_ser = deschide_port(args.gsm_port, 9600, timeout=2, inregistrare=log_gsm)     # Port GSM
+
+# Citirea GPS ruleaza in fundal; la detectie se foloseste doar ultima pozitie recenta
+gps = GpsReader(gps_ser)
+gps.start()
+
+# Contoarele de functionare; sunt expuse doar daca s-a cerut --metrics_port sau --metrics_file
+metrici = Metrici(labels, gps=gps)
+exportatori_metrici = []
+if args.metrics_port is not None:
+    exportatori_metrici.append(ServerMetrici(metrici, port=int(args.metrics_port), adresa=args.metrics_bind))
+if args.metrics_file is not None:
+    exportatori_metrici.append(FisierMetrici(metrici, args.metrics_file))
+for exportator in exportatori_metrici:
+    exportator.start()
 
 # Seteaza numarul de telefon destinatar 
 numar_telefon = "+40712345678"
 
-# Functie pentru trimitere SMS prin SIM800L
-def trimite_sms(text):
-    gsm_ser.write(b'AT\r')
-    time.sleep(1)
-    gsm_ser.write(b'AT+CMGF=1\r')
-    time.sleep(1)
-    gsm_ser.write(f'AT+CMGS="{numar_telefon}"\r'.encode())
-    time.sleep(1)
-    gsm_ser.write(text.encode() + b"\x1A")  # Ctrl+Z pentru terminare mesaj
-    print("SMS trimis:", text)
-    time.sleep(3)
-
-# Variabila pentru a nu trimite spam (salveaza ultima locatie pentru care a trimis SMS)
-ultima_locatie_sms = None
+# Destinatarii alertelor (padurari, primarie...) din --recipients; daca lipsesc, se foloseste numarul de mai sus
+destinatari = citeste_destinatari(args.recipients) or [numar_telefon]
+print(f"Alertele vor fi trimise catre: {', '.join(destinatari)}")
+
+# Jurnalul persistent al alertelor: suprima alertele repetate din aceeasi zona si limiteaza SMS-urile pe ora
+suprimare = AlertSuppressor(args.alert_db, raza_m=float(args.alert_radius), pauza_s=float(args.alert_cooldown),
+                            max_pe_ora=int(args.alert_max_hour))
+
+# Rezultatul fiecarui SMS (referinta +CMGS sau eroarea) este afisat si scris in jurnalul alertelor
+def la_rezultat_sms(rezultat):
+    afiseaza_rezultat(rezultat)
+    metrici.sms_rezultat(rezultat)
+    suprimare.inregistreaza_rezultat(rezultat.eticheta, rezultat.trimis, rezultat.referinta, rezultat.eroare)
+
+# Dispecerul SMS trimite alertele in fundal prin SIM800L
+dispecer_sms = SmsDispatcher(gsm_ser, numar_telefon, la_rezultat=la_rezultat_sms)
+dispecer_sms.start()
+
+# Functie pentru trimitere SMS: pune alerta in coada si revine imediat
+def trimite_sms(text, numere, id_alerte):
+    if not dispecer_sms.trimite_tuturor(text, numere, id_alerte):
+        print("Coada de SMS-uri este plina, alerta nu a fost trimisa:", text)
+        for id_alerta in id_alerte:
+            suprimare.inregistreaza_rezultat(id_alerta, False, eroare='coada plina')
+        return
+    metrici.sms_pus_in_coada(len(numere))
 
 # ------------------- DETECTARE TIP SURSA (IMAGINE/VIDEO/CAMERA) -------------------
 img_ext_list = ['.jpg','.JPG','.jpeg','.JPEG','.png','.PNG','.bmp','.BMP']
@@ -79,6 +153,39 @@ else:
     print(f'Input {img_source} is invalid. Please try again.')
     sys.exit(0)
 
+# Inferenta pe tile-uri, pentru ursii indepartati din imaginile de rezolutie mare (doar imagini/foldere)
+tile = int(args.tile) if args.tile is not None and source_type in ['image', 'folder'] else None
+lot_tile = None if backend in BACKENDURI_CU_LOT else 1
+
+# Zona de interes a camerei: inferenta doar pe dreptunghiul ROI-ului, fara detectii in zonele excluse
+zona = ZonaInteres.din_fisier(args.roi) if args.roi is not None else None
+
+# Filtrul de miscare se foloseste doar pentru surse video/camera, unde frame-urile consecutive se pot compara
+poarta_miscare = None
+if args.motion is not None and source_type in ['video', 'usb', 'picamera']:
+    poarta_miscare = MotionGate(sensibilitate=float(args.motion), keepalive=int(args.keepalive))
+
+# Planificatorul stabileste la cate frame-uri ruleaza detectia (doar pentru surse video/camera)
+if source_type in ['video', 'usb', 'picamera']:
+    planificator = InferenceScheduler(pas=int(args.infer_every),
+                                      frecventa_repaus=None if args.infer_hz is None else float(args.infer_hz))
+else:
+    planificator = InferenceScheduler()
+
+# Tracker-ul confirma ursul pe mai multe frame-uri si retine pentru ce track s-a trimis deja alerta.
+# Imaginile dintr-un folder nu sunt consecutive, deci acolo fiecare detectie se confirma imediat.
+if source_type in ['video', 'usb', 'picamera']:
+    confirm_k, confirm_m = int(args.confirm.split('/')[0]), int(args.confirm.split('/')[1])
+else:
+    confirm_k, confirm_m = 1, 1
+tracker_urs = BearTracker(k=confirm_k, m=confirm_m)
+
+# Clipurile la alerta: doar pentru surse video/camera; frame-urile recente sunt tinute in memorie ca JPEG
+inregistrator_clip = None
+if args.clip and source_type in ['video', 'usb', 'picamera']:
+    inregistrator_clip = EventRecorder(pre_s=float(args.pre_roll), post_s=float(args.post_roll), fps=int(args.clip_fps))
+    inregistrator_clip.start()
+
 # ------------------- REZOLUTIE & INREGISTRARE -------------------
 resize = False
 if user_res:
@@ -97,6 +204,7 @@ if record:
     recorder = cv2.VideoWriter(record_name, cv2.VideoWriter_fourcc(*'MJPG'), record_fps, (resW,resH))
 
 # ------------------- INCARCARE SURSA -------------------
+preincarcare = None
 if source_type == 'image':
     imgs_list = [img_source]
 elif source_type == 'folder':
@@ -106,6 +214,10 @@ elif source_type == 'folder':
         _, file_ext = os.path.splitext(file)
         if file_ext in img_ext_list:
             imgs_list.append(file)
+    # Imaginile urmatoare sunt decodate in paralel cu inferenta; cu --resolution, JPEG-urile mari sunt decodate direct micsorate
+    if int(args.prefetch) > 0:
+        preincarcare = ImagePrefetcher(imgs_list, marime=int(args.prefetch),
+                                       rezolutie=(resW, resH) if resize and tile is None else None)
 elif source_type == 'video' or source_type == 'usb':
     if source_type == 'video': cap_arg = img_source
     elif source_type == 'usb': cap_arg = usb_idx
@@ -119,6 +231,20 @@ elif source_type == 'picamera':
     cap.configure(cap.create_video_configuration(main={"format": 'RGB888', "size": (resW, resH)}))
     cap.start()
 
+# Porneste captura pe fir separat: frame-urile sunt citite in paralel cu inferenta
+if source_type in ['video', 'usb', 'picamera']:
+    if source_type == 'picamera':
+        citeste_frame = cap.capture_array
+    else:
+        citeste_frame = citire_videocapture(cap, live=(source_type == 'usb'))
+    # Pentru fisiere video nu se pierde niciun frame; pentru camere se pastreaza doar cele mai noi
+    captura = FrameCapture(citeste_frame, fara_pierderi=(source_type == 'video'))
+    captura.start()
+    metrici.captura = captura
+
+# Frame-urile pierdute si cele fara miscare sunt citite direct din captura si din filtrul de miscare
+metrici.poarta_miscare = poarta_miscare
+
 bbox_colors = [
     (164,120,87), (68,148,228), (93,97,209), (178,182,133), (88,159,106),
     (96,202,231), (159,124,168), (169,162,241), (98,118,150), (172,176,184)
@@ -128,116 +254,160 @@ avg_frame_rate = 0
 frame_rate_buffer = []
 fps_avg_len = 200
 img_count = 0
+boxes_xyxy, boxes_conf, boxes_cls = detectii_goale()
+# Durata etapelor pe frame, doar cu --profile
+profil = ProfilEtape(args.profile, backend=backend, sursa=img_source, rezolutie=user_res)
+
+# In modul headless programul se opreste curat la SIGINT (Ctrl+C) sau SIGTERM, nu cu tasta 'q'
+oprire = False
+def opreste_programul(signum, stack):
+    global oprire
+    oprire = True
+if headless:
+    signal.signal(signal.SIGINT, opreste_programul)
+    signal.signal(signal.SIGTERM, opreste_programul)
 
 # ------------------- LOOP PRINCIPAL -------------------
-while True:
+while not oprire:
     t_start = time.perf_counter()
+    profil.inceput()
 
     # Incarca frame-ul in functie de sursa
     if source_type == 'image' or source_type == 'folder':
         if img_count >= len(imgs_list):
             print('All images have been processed. Exiting program.')
-            sys.exit(0)
+            break
         img_filename = imgs_list[img_count]
-        frame = cv2.imread(img_filename)
+        frame = preincarcare.citeste() if preincarcare is not None else cv2.imread(img_filename)
         img_count += 1
     elif source_type == 'video':
-        ret, frame = cap.read()
-        if not ret:
+        frame = captura.citeste()
+        if frame is None:
             print('Reached end of the video file. Exiting program.')
             break
     elif source_type == 'usb':
-        ret, frame = cap.read()
-        if (frame is None) or (not ret):
+        frame = captura.citeste()
+        if frame is None:
             print('Unable to read frames from the camera.')
             break
     elif source_type == 'picamera':
-        frame = cap.capture_array()
+        frame = captura.citeste()
         if (frame is None):
             print('Unable to read frames from the Picamera.')
             break
 
+    profil.etapa('captura')
+
     # Redimensioneaza daca e cazul
+    frame_original = frame
     if resize:
         frame = cv2.resize(frame, (resW, resH))
+    profil.etapa('redimensionare')
+
+    # Planificatorul decide daca detectia ruleaza pe acest frame; altfel raman detectiile anterioare
+    detectie_noua = planificator.trebuie_inferenta()
+    if detectie_noua:
+        # Ruleaza YOLO pe frame doar daca scena s-a schimbat (sau la inferenta fortata de keep-alive)
+        if poarta_miscare is None or poarta_miscare.trebuie_inferenta(frame):
+            t_inferenta = time.perf_counter()
+            if tile is not None:
+                # Tile-urile se taie din imaginea originala; box-urile sunt aduse apoi la rezolutia frame-ului
+                boxes_xyxy, boxes_conf, boxes_cls = detecteaza_pe_tile(model, frame_original, min_thresh, tile,
+                                                                       float(args.tile_overlap), lot=lot_tile)
+                if frame is not frame_original:
+                    boxes_xyxy = scaleaza_boxes(boxes_xyxy, frame_original.shape, frame.shape)
+            else:
+                # Cu --roi modelul vede doar dreptunghiul zonei de interes, deci o imagine mai mica
+                decupaj, (x0, y0) = zona.decupeaza(frame) if zona is not None else (frame, (0, 0))
+                results = model(decupaj, verbose=False)
+                # Preia o singura data pe frame coordonatele, scorurile si clasele si pastreaza doar detectiile peste prag
+                boxes_xyxy, boxes_conf, boxes_cls = extrage_detectii(results[0].boxes, min_thresh)
+                if x0 or y0:
+                    boxes_xyxy = boxes_xyxy + np.array([x0, y0, x0, y0])
+            if zona is not None:
+                # Elimina detectiile cu centrul in afara ROI-ului sau intr-o zona exclusa
+                boxes_xyxy, boxes_conf, boxes_cls = zona.filtreaza(boxes_xyxy, boxes_conf, boxes_cls, frame.shape)
+            metrici.inferenta((time.perf_counter() - t_inferenta) * 1000, boxes_cls)
+        else:
+            detectie_noua = False
+    profil.etapa('inferenta')
+    object_count = len(boxes_conf)
+    alerta_noua = False
 
-    # Ruleaza YOLO pe frame
-    results = model(frame, verbose=False)
-    detections = results[0].boxes
-    object_count = 0
-
-    # Verifica daca este detectat ursul cu scor peste 80%
-    for i in range(len(detections)):
-        xyxy_tensor = detections[i].xyxy.cpu()
-        xyxy = xyxy_tensor.numpy().squeeze()
-        xmin, ymin, xmax, ymax = xyxy.astype(int)
-        classidx = int(detections[i].cls.item())
-        classname = labels[classidx]
-        conf = detections[i].conf.item()
-
-        # Daca este "urs" si scorul e peste prag, trimite SMS cu coordonate GPS sau cu coordonatele prestabilite
-        if classname.lower() == "urs" and conf > min_thresh:
-            locatie = None
-            # Incearca sa citesti coordonatele de la GPS (max 2 secunde)
-            start_time = time.time()
-            while time.time() - start_time < 2:
-                try:
-                    line = gps_ser.readline().decode(errors='ignore').strip()
-                    if line.startswith('$GPGGA') or line.startswith('$GPRMC'):
-                        try:
-                            msg = pynmea2.parse(line)
-                            lat = msg.latitude
-                            lon = msg.longitude
-                            if lat != 0.0 and lon != 0.0:
-                                locatie = f"{lat:.6f},{lon:.6f}"
-                                break
-                        except pynmea2.ParseError:
-                            continue
-                except Exception:
-                    break  # Daca portul GPS nu e deschis, iesi din bucla
+    # Urmareste ursii doar pe detectii noi, nu pe cele pastrate intre frame-uri
+    masca_urs = np.isin(boxes_cls, clase_urs)
+    urs_detectat = detectie_noua and masca_urs.any()
+    trackuri_confirmate = tracker_urs.actualizeaza(boxes_xyxy[masca_urs]) if detectie_noua else []
+    profil.etapa('postprocesare')
 
+    # Daca un urs nou a fost confirmat, trimite SMS cu coordonate GPS sau cu coordonatele prestabilite
+    if trackuri_confirmate:
+        # Clipul porneste la confirmare, chiar daca SMS-ul este amanat sau suprimat
+        if inregistrator_clip is not None:
+            inregistrator_clip.declanseaza()
+        # Foloseste ultima pozitie GPS daca este recenta (fara asteptare pe portul serial)
+        pozitie = gps.pozitie_recenta()
+        if pozitie is not None:
+            lat, lon = pozitie.lat, pozitie.lon
+        else:
             # Daca nu ai gasit coordonate valide, foloseste coordonatele default
-            if not locatie:
-                locatie = "44.433633,26.056708"
-
-            # Trimite SMS doar daca nu ai trimis deja pentru acea locatie
-            if locatie != ultima_locatie_sms:
-                mesaj = f"Atentie! Urs detectat la coordonatele: {locatie}"
-                trimite_sms(mesaj)
-                ultima_locatie_sms = locatie
-
-        # Deseneaza bounding box daca scorul e peste prag
-        if conf > min_thresh:
-            color = bbox_colors[classidx % 10]
-            cv2.rectangle(frame, (xmin,ymin), (xmax,ymax), color, 2)
-            label = f'{classname}: {int(conf*100)}%'
-            labelSize, baseLine = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
-            label_ymin = max(ymin, labelSize[1] + 10)
-            cv2.rectangle(frame, (xmin, label_ymin-labelSize[1]-10), (xmin+labelSize[0], label_ymin+baseLine-10), color, cv2.FILLED)
-            cv2.putText(frame, label, (xmin, label_ymin-7), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 1)
-            object_count += 1
-
-    # Afiseaza FPS daca e video/camera
-    if source_type in ['video', 'usb', 'picamera']:
-        cv2.putText(frame, f'FPS: {avg_frame_rate:0.2f}', (10,20), cv2.FONT_HERSHEY_SIMPLEX, .7, (0,255,255), 2)
-
-    # Afiseaza numar obiecte detectate
-    cv2.putText(frame, f'Number of objects: {object_count}', (10,40), cv2.FONT_HERSHEY_SIMPLEX, .7, (0,255,255), 2)
-    cv2.imshow('YOLO detection results', frame)
+            lat, lon = 44.433633, 26.056708
+        locatie = f"{lat:.6f},{lon:.6f}"
+
+        # Suprima alertele din aceeasi zona in perioada de pauza si respecta limita pe ora a fiecarui destinatar
+        if suprimare.trebuie_trimisa(lat, lon):
+            mesaj = f"Atentie! Urs detectat la coordonatele: {locatie}"
+            numere = suprimare.destinatari_permisi(destinatari)
+            if numere:
+                # Fiecare SMS are randul lui in jurnal; dispecerul completeaza rezultatul livrarii
+                id_alerte = [suprimare.inregistreaza(lat, lon, numar, mesaj) for numar in numere]
+                trimite_sms(mesaj, numere, id_alerte)
+                alerta_noua = True
+        # Un singur SMS pe track, cat timp ursul ramane urmarit
+        for track in trackuri_confirmate:
+            tracker_urs.marcheaza_alertat(track)
+    profil.etapa('alerta')
+
+    # In modul headless frame-ul este adnotat doar daca trebuie salvat (inregistrare sau captura la alerta)
+    if not headless or record or alerta_noua:
+        # Deseneaza bounding box-urile care au trecut de prag
+        deseneaza_detectii(frame, boxes_xyxy, boxes_conf, boxes_cls, labels, bbox_colors)
+
+        # Afiseaza FPS daca e video/camera
+        if source_type in ['video', 'usb', 'picamera']:
+            cv2.putText(frame, f'FPS: {avg_frame_rate:0.2f}', (10,20), cv2.FONT_HERSHEY_SIMPLEX, .7, (0,255,255), 2)
+
+        # Afiseaza numar obiecte detectate
+        cv2.putText(frame, f'Number of objects: {object_count}', (10,40), cv2.FONT_HERSHEY_SIMPLEX, .7, (0,255,255), 2)
+
+    profil.etapa('desenare')
+
     if record: recorder.write(frame)
+    if inregistrator_clip is not None:
+        inregistrator_clip.adauga(frame)
 
-    # Comenzi tastatura: q = quit, s = pauza, p = salveaza poza
-    if source_type in ['image', 'folder']:
-        key = cv2.waitKey()
+    if headless:
+        # Fara monitor: pastreaza o captura adnotata pentru fiecare alerta trimisa
+        if alerta_noua:
+            cv2.imwrite(time.strftime('alerta_%Y%m%d_%H%M%S.jpg'), frame)
     else:
-        key = cv2.waitKey(5)
+        cv2.imshow('YOLO detection results', frame)
 
-    if key == ord('q') or key == ord('Q'):
-        break
-    elif key == ord('s') or key == ord('S'):
-        cv2.waitKey()
-    elif key == ord('p') or key == ord('P'):
-        cv2.imwrite('capture.png', frame)
+        # Comenzi tastatura: q = quit, s = pauza, p = salveaza poza
+        if source_type in ['image', 'folder']:
+            key = cv2.waitKey()
+        else:
+            key = cv2.waitKey(5)
+
+        if key == ord('q') or key == ord('Q'):
+            break
+        elif key == ord('s') or key == ord('S'):
+            cv2.waitKey()
+        elif key == ord('p') or key == ord('P'):
+            cv2.imwrite('capture.png', frame)
+
+    profil.etapa('afisare')
+    profil.sfarsit(detectie_noua)
 
     # FPS pentru frame curent
     t_stop = time.perf_counter()
@@ -247,12 +417,31 @@ while True:
         frame_rate_buffer.pop(0)
     frame_rate_buffer.append(frame_rate_calc)
     avg_frame_rate = np.mean(frame_rate_buffer)
+    metrici.frame(avg_frame_rate)
+
+    # Adapteaza rata detectiei dupa FPS-ul masurat si dupa prezenta ursului
+    planificator.actualizeaza(avg_frame_rate, urs_detectat)
 
 # Clean up final
 print(f'Average pipeline FPS: {avg_frame_rate:.2f}')
+if poarta_miscare is not None:
+    print(f'Frame-uri fara miscare (inferenta sarita): {poarta_miscare.frame_uri_sarite}')
+if source_type in ['video', 'usb', 'picamera']:
+    captura.stop()
 if source_type in ['video', 'usb']:
     cap.release()
 elif source_type == 'picamera':
     cap.stop()
 if record: recorder.release()
-cv2.destroyAllWindows()
+if preincarcare is not None:
+    preincarcare.inchide()
+if inregistrator_clip is not None:
+    inregistrator_clip.stop(timeout=30)
+gps.stop()
+dispecer_sms.stop(timeout=30)
+for exportator in exportatori_metrici:
+    exportator.stop()
+suprimare.inchide()
+profil.inchide()
+if not headless:
+    cv2.destroyAllWindows()
@@ -0,0 +1,104 @@
+# Inregistrarea clipurilor video doar la alerta, cu frame-uri dinainte de eveniment
+# Ultimele pre_s secunde sunt pastrate in memorie ca JPEG-uri comprimate (un inel limitat in timp).
+# Cand ursul este confirmat, inelul devine inceputul clipului, se mai adauga post_s secunde dupa ultima
+# declansare (dar cel mult max_s secunde de la inceputul evenimentului, ca memoria sa ramana limitata),
+# iar clipul este scris pe card de un fir separat, ca scrierea sa nu opreasca detectia.
+
+import os                # Pentru folderul clipurilor
+import queue             # Evenimentele terminate, in asteptarea scrierii
+import threading         # Firul care scrie clipurile
+import time              # Pentru durata inelului si a clipului
+from collections import deque
+
+import cv2               # Pentru comprimarea JPEG si scrierea clipului
+
+
+class EventRecorder(threading.Thread):
+    # pre_s / post_s: secunde pastrate inainte si inregistrate dupa eveniment; fps: cate frame-uri pe secunda
+    # sunt pastrate (restul sunt sarite, ca sa nu fie comprimat fiecare frame); calitate: calitatea JPEG
+    # max_s: durata maxima a unui clip dupa declansare, oricat de des este prelungit
+    def __init__(self, folder='clipuri', pre_s=5.0, post_s=10.0, fps=10, calitate=80, max_coada=4, max_s=60.0):
+        super().__init__(daemon=True)
+        self.folder = folder
+        self.pre_s = pre_s
+        self.post_s = post_s
+        self.fps = fps
+        self.max_s = max_s
+        self.parametri_jpeg = [int(cv2.IMWRITE_JPEG_QUALITY), calitate]
+        self.clipuri_scrise = 0
+        self._inel = deque()             # (timestamp, jpeg) pentru ultimele pre_s secunde
+        self._ultimul = 0.0
+        self._eveniment = None           # Frame-urile clipului in curs, daca exista
+        self._sfarsit = 0.0
+        self._limita = 0.0               # Momentul dupa care clipul in curs nu mai poate fi prelungit
+        self._nume = None
+        self._coada = queue.Queue(maxsize=max_coada)
+        os.makedirs(folder, exist_ok=True)
+
+    # Apelat pe fiecare frame; pastreaza cel mult fps frame-uri pe secunda
+    def adauga(self, frame):
+        acum = time.monotonic()
+        if acum - self._ultimul < 1.0 / self.fps:
+            return
+        self._ultimul = acum
+        ok, jpeg = cv2.imencode('.jpg', frame, self.parametri_jpeg)
+        if not ok:
+            return
+        if self._eveniment is not None:
+            self._eveniment.append((acum, jpeg))
+            if acum >= self._sfarsit:
+                self._termina()
+            return
+        self._inel.append((acum, jpeg))
+        while self._inel and acum - self._inel[0][0] > self.pre_s:
+            self._inel.popleft()
+
+    # Porneste (sau prelungeste) un clip: frame-urile din inel plus post_s secunde de acum inainte,
+    # fara sa depaseasca max_s secunde de la prima declansare
+    def declanseaza(self, nume=None):
+        acum = time.monotonic()
+        if self._eveniment is None:
+            self._eveniment = list(self._inel)
+            self._inel.clear()
+            self._limita = acum + self.max_s
+            self._nume = nume or time.strftime('clip_%Y%m%d_%H%M%S.avi')
+        self._sfarsit = min(acum + self.post_s, self._limita)
+
+    # Opreste firul dupa scrierea clipului in curs si a celor deja in coada
+    def stop(self, timeout=None):
+        if self._eveniment is not None:
+            self._termina()
+        self._coada.put(None)
+        self.join(timeout)
+
+    def _termina(self):
+        try:
+            self._coada.put_nowait((self._nume, self._eveniment))
+        except queue.Full:
+            print(f'Prea multe clipuri in asteptare, clipul {self._nume} nu a fost salvat.')
+        self._eveniment = None
+
+    def run(self):
+        while True:
+            eveniment = self._coada.get()
+            if eveniment is None:
+                break
+            nume, frame_uri = eveniment
+            if frame_uri:
+                self._scrie(os.path.join(self.folder, nume), frame_uri)
+
+    def _scrie(self, cale, frame_uri):
+        # FPS-ul clipului este cel real al frame-urilor pastrate, ca durata clipului sa fie corecta
+        durata = frame_uri[-1][0] - frame_uri[0][0]
+        fps = (len(frame_uri) - 1) / durata if durata > 0 else self.fps
+        primul = cv2.imdecode(frame_uri[0][1], cv2.IMREAD_COLOR)
+        inaltime, latime = primul.shape[:2]
+        scriitor = cv2.VideoWriter(cale, cv2.VideoWriter_fourcc(*'MJPG'), fps, (latime, inaltime))
+        for _, jpeg in frame_uri:
+            frame = cv2.imdecode(jpeg, cv2.IMREAD_COLOR)
+            if frame.shape[:2] != (inaltime, latime):
+                frame = cv2.resize(frame, (latime, inaltime))
+            scriitor.write(frame)
+        scriitor.release()
+        self.clipuri_scrise += 1
+        print(f'Clip salvat: {cale} ({len(frame_uri)} frame-uri, {durata:.1f} s)')
@@ -0,0 +1,90 @@
+# Exporta modelul YOLO antrenat in formate optimizate pentru rularea pe CPU (Raspberry Pi)
+# Variantele sunt salvate langa best.pt, unde sunt gasite automat de scripturile de detectie (backend.py).
+# Optional, modelul este cuantizat INT8, calibrat pe imaginile din data/validation/images (split_images.py).
+
+import os                # Pentru operatii cu sistemul de fisiere
+import sys               # Pentru terminarea programului in caz de eroare
+import glob              # Pentru lista imaginilor de calibrare
+import argparse          # Pentru parsarea argumentelor din linia de comanda
+
+import cv2               # Pentru citirea imaginilor de calibrare
+import numpy as np       # Pentru pregatirea tensorilor de calibrare
+from ultralytics import YOLO
+
+from backend import scrie_yaml_validare
+
+# Defineste si parseaza argumentele introduse de utilizator
+parser = argparse.ArgumentParser()
+parser.add_argument('--model', help='Calea catre modelul YOLO antrenat (exemplu: "best.pt")', required=True)
+parser.add_argument('--format', help='Formatul exportat: onnx, openvino, ncnn sau all (toate)', default='all')
+parser.add_argument('--int8', help='Cuantizeaza modelul INT8 (pentru onnx si openvino), calibrat pe imaginile de validare',
+                    action='store_true')
+parser.add_argument('--data', help='Folderul cu datasetul impartit de split_images.py (exemplu: "data")', default='data')
+parser.add_argument('--imgsz', help='Rezolutia de intrare a modelului exportat (exemplu: "640")', default=640)
+args = parser.parse_args()
+
+model_path = args.model
+formate = ['onnx', 'openvino', 'ncnn'] if args.format == 'all' else [args.format]
+int8 = args.int8
+data_path = args.data
+imgsz = int(args.imgsz)
+
+# Verifica daca datele introduse sunt valide
+if not os.path.exists(model_path) or not model_path.endswith('.pt'):
+    print('EROARE: Calea catre model este invalida. Exportul porneste de la modelul PyTorch (.pt).')
+    sys.exit(0)
+for fmt in formate:
+    if fmt not in ['onnx', 'openvino', 'ncnn']:
+        print(f'Formatul {fmt} nu este suportat. Alege onnx, openvino, ncnn sau all.')
+        sys.exit(0)
+imagini_calibrare = sorted(glob.glob(os.path.join(data_path, 'validation', 'images', '*')))
+if int8 and not imagini_calibrare:
+    print(f'Nu exista imagini de calibrare in {data_path}/validation/images. Ruleaza mai intai split_images.py.')
+    sys.exit(0)
+
+model = YOLO(model_path, task='detect')
+
+
+# Furnizeaza imaginile de validare catre ONNX Runtime pentru calibrarea INT8
+# (aceeasi preprocesare ca la inferenta: RGB, imgsz x imgsz, valori 0-1, format NCHW)
+def cititor_calibrare(nume_intrare, imagini, max_imagini=200):
+    from onnxruntime.quantization import CalibrationDataReader
+
+    class CititorCalibrare(CalibrationDataReader):
+        def __init__(self):
+            self.imagini = iter(imagini[:max_imagini])
+
+        def get_next(self):
+            for cale in self.imagini:
+                img = cv2.imread(cale)
+                if img is None:
+                    continue
+                img = cv2.cvtColor(cv2.resize(img, (imgsz, imgsz)), cv2.COLOR_BGR2RGB)
+                tensor = img.transpose(2, 0, 1)[np.newaxis].astype(np.float32) / 255.0
+                return {nume_intrare: tensor}
+            return None
+
+    return CititorCalibrare()
+
+
+for fmt in formate:
+    print(f'Export {fmt}{" INT8" if int8 and fmt != "ncnn" else ""}...')
+    if fmt == 'openvino' and int8:
+        # OpenVINO calibreaza INT8 direct pe setul de date descris in fisierul YAML
+        cale_yaml = scrie_yaml_validare(data_path, model.names, 'calibrare_int8.yaml')
+        cale = model.export(format='openvino', imgsz=imgsz, int8=True, data=cale_yaml)
+    elif fmt == 'onnx' and int8:
+        from onnxruntime import InferenceSession
+        from onnxruntime.quantization import quantize_static, QuantFormat, QuantType
+        cale_fp32 = model.export(format='onnx', imgsz=imgsz)
+        cale = os.path.splitext(model_path)[0] + '_int8.onnx'
+        nume_intrare = InferenceSession(cale_fp32, providers=['CPUExecutionProvider']).get_inputs()[0].name
+        quantize_static(cale_fp32, cale, cititor_calibrare(nume_intrare, imagini_calibrare),
+                        quant_format=QuantFormat.QDQ, activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+    else:
+        if fmt == 'ncnn' and int8:
+            print('Exportul NCNN nu suporta INT8; se exporta varianta FP32.')
+        cale = model.export(format=fmt, imgsz=imgsz)
+    print(f'Model exportat la {cale}')
+
+print('\nRuleaza compara_backend.py pentru a verifica viteza si recall-ul fiecarei variante.')
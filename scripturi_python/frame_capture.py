@@ -0,0 +1,77 @@
+# Captura frame-urilor pe un fir de executie separat
+# Citirea din camera / fisier video se suprapune cu inferenta YOLO. Pentru sursele live se pastreaza
+# doar ultimele N frame-uri (cele vechi sunt aruncate), astfel incat modelul primeste mereu cel mai
+# nou frame. Pentru fisierele video modul fara pierderi asteapta consumatorul si nu arunca nimic.
+
+import threading         # Pentru firul de captura si sincronizarea cu bucla principala
+from collections import deque
+
+import cv2               # Pentru setarea bufferului intern al camerei
+
+
+# Intoarce o functie de citire pentru cv2.VideoCapture: frame-ul sau None daca nu mai sunt frame-uri
+def citire_videocapture(cap, live=False):
+    if live:
+        # Bufferul intern OpenCV ar livra frame-uri vechi; captura proprie il inlocuieste
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+    def citeste():
+        ret, frame = cap.read()
+        return frame if ret else None
+    return citeste
+
+
+class FrameCapture(threading.Thread):
+    # citeste_frame: functie fara argumente care intoarce urmatorul frame sau None la final
+    # marime_buffer: cate frame-uri se pastreaza; fara_pierderi: True pentru fisiere video
+    def __init__(self, citeste_frame, marime_buffer=2, fara_pierderi=False):
+        super().__init__(daemon=True)
+        self.citeste_frame = citeste_frame
+        self.fara_pierderi = fara_pierderi
+        self.frame_uri_pierdute = 0
+        self._frames = deque(maxlen=marime_buffer)
+        self._cond = threading.Condition()
+        self._terminat = False
+        self._oprit = False
+
+    def run(self):
+        while not self._oprit:
+            try:
+                frame = self.citeste_frame()
+            except Exception:
+                frame = None
+            with self._cond:
+                if frame is None:
+                    break
+                if self.fara_pierderi:
+                    # Asteapta pana cand bucla principala elibereaza un loc
+                    self._cond.wait_for(lambda: len(self._frames) < self._frames.maxlen or self._oprit)
+                elif len(self._frames) == self._frames.maxlen:
+                    self.frame_uri_pierdute += 1   # deque arunca automat cel mai vechi frame
+                self._frames.append(frame)
+                self._cond.notify_all()
+        with self._cond:
+            self._terminat = True
+            self._cond.notify_all()
+
+    # Intoarce urmatorul frame (cel mai nou pentru surse live) sau None daca sursa s-a terminat
+    def citeste(self, timeout=None):
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._frames or self._terminat, timeout):
+                return None
+            if not self._frames:
+                return None
+            if self.fara_pierderi:
+                frame = self._frames.popleft()
+            else:
+                frame = self._frames.pop()
+                self.frame_uri_pierdute += len(self._frames)
+                self._frames.clear()
+            self._cond.notify_all()
+            return frame
+
+    def stop(self, timeout=2):
+        with self._cond:
+            self._oprit = True
+            self._cond.notify_all()
+        self.join(timeout)
@@ -0,0 +1,71 @@
+# Cititor GPS pe fir de executie separat
+# Consuma continuu mesajele NMEA de pe portul serial si pastreaza ultima pozitie valida,
+# astfel incat bucla de detectie sa poata citi coordonatele instantaneu, fara sa astepte portul serial.
+# Sunt acceptate doar mesajele GGA/RMC cu suma de control corecta si fix valid (vezi nmea.py).
+
+import threading         # Pentru firul de executie de fundal si lock
+import time              # Pentru marcajul de timp al fiecarei pozitii
+from collections import namedtuple
+
+from nmea import parseaza   # Parsare NMEA direct din bytes, cu verificarea sumei de control
+
+# Pozitia citita de la GPS: coordonate, momentul receptiei (time.monotonic), varsta in secunde,
+# daca pozitia este mai veche decat limita acceptata, calitatea fix-ului, HDOP, sateliti si ora UTC
+# (calitatea, HDOP-ul si satelitii sunt cei din ultimul mesaj GGA; None daca receptorul trimite doar RMC)
+PozitieGps = namedtuple('PozitieGps', ['lat', 'lon', 'timestamp', 'varsta', 'invechita',
+                                       'calitate', 'hdop', 'sateliti', 'utc'])
+
+
+class GpsReader(threading.Thread):
+    # ser: portul serial deja deschis (ex. serial.Serial('/dev/ttyAMA3', 9600, timeout=1))
+    # max_varsta: dupa cate secunde fara mesaj valid pozitia este considerata invechita
+    # max_hdop: pozitiile cu HDOP mai mare nu sunt folosite pentru alerte (None = fara limita)
+    def __init__(self, ser, max_varsta=5.0, max_hdop=5.0):
+        super().__init__(daemon=True)
+        self.ser = ser
+        self.max_varsta = max_varsta
+        self.max_hdop = max_hdop
+        self._lock = threading.Lock()
+        self._fix = None          # (lat, lon, timestamp, calitate, hdop, sateliti, utc) pentru ultima pozitie valida
+        self._gga = (None, None, None)   # Calitatea, HDOP-ul si satelitii din ultimul GGA
+        self._oprit = threading.Event()
+
+    def run(self):
+        while not self._oprit.is_set():
+            try:
+                line = self.ser.readline()
+            except Exception:
+                # Portul nu raspunde (deconectat, inchis); reincearca fara sa opreasca detectia
+                time.sleep(1)
+                continue
+            msg = parseaza(line)
+            if msg is None:
+                continue
+            if msg.tip == 'GGA':
+                self._gga = (msg.calitate, msg.hdop, msg.sateliti)
+            # Pastreaza doar fix-urile valide (GGA cu calitate > 0, RMC cu status 'A'), cu coordonate nenule
+            if msg.valid and msg.lat != 0.0 and msg.lon != 0.0:
+                with self._lock:
+                    self._fix = (msg.lat, msg.lon, time.monotonic()) + self._gga + (msg.utc,)
+
+    # Returneaza ultima pozitie cunoscuta (PozitieGps) sau None daca GPS-ul nu a avut inca fix
+    def ultima_pozitie(self):
+        with self._lock:
+            fix = self._fix
+        if fix is None:
+            return None
+        lat, lon, timestamp, calitate, hdop, sateliti, utc = fix
+        varsta = time.monotonic() - timestamp
+        return PozitieGps(lat, lon, timestamp, varsta, varsta > self.max_varsta, calitate, hdop, sateliti, utc)
+
+    # Returneaza ultima pozitie doar daca este recenta si suficient de precisa, altfel None
+    def pozitie_recenta(self):
+        pozitie = self.ultima_pozitie()
+        if pozitie is None or pozitie.invechita:
+            return None
+        if self.max_hdop is not None and pozitie.hdop is not None and pozitie.hdop > self.max_hdop:
+            return None
+        return pozitie
+
+    def stop(self):
+        self._oprit.set()
@@ -0,0 +1,210 @@
+# Metrici de functionare pentru unitatea din teren, fara monitor
+# Bucla de detectie actualizeaza doar cateva contoare alocate la pornire (fara alocari pe frame).
+# Textul in format Prometheus este construit abia la cerere: de serverul HTTP local (/metrics si /health)
+# sau de scriitorul periodic al fisierului de metrici (compatibil cu textfile collector din node_exporter).
+# ProfilEtape scrie optional durata fiecarei etape a buclei, pe frame, pentru benchmark.py.
+
+import os                # Pentru inlocuirea atomica a fisierului de metrici
+import json              # Pentru fisierul de profil al etapelor
+import threading         # Serverul HTTP si scriitorul ruleaza pe fire separate
+import time              # Pentru varsta ultimului frame si uptime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np       # Contoarele de detectii pe clasa
+
+FISIER_TEMPERATURA = '/sys/class/thermal/thermal_zone0/temp'
+
+
+# Temperatura procesorului in grade Celsius (Raspberry Pi / Linux) sau None daca nu poate fi citita
+def temperatura_cpu():
+    try:
+        with open(FISIER_TEMPERATURA) as f:
+            return int(f.read().strip()) / 1000
+    except (OSError, ValueError):
+        return None
+
+
+class Metrici:
+    # labels: model.names (indice -> nume clasa); gps: GpsReader optional pentru varsta si calitatea fix-ului
+    # captura (FrameCapture) si poarta_miscare (MotionGate) pot fi atasate si dupa creare
+    def __init__(self, labels, gps=None, captura=None, poarta_miscare=None):
+        self.labels = labels
+        self.gps = gps
+        self.captura = captura
+        self.poarta_miscare = poarta_miscare
+        self.frame_uri = 0
+        self.inferente = 0
+        self.fps = 0.0
+        self.ms_inferenta = 0.0
+        self.detectii = np.zeros(max(labels) + 1 if labels else 1, dtype=np.int64)
+        self.sms_in_coada = 0
+        self.sms_trimise = 0
+        self.sms_esuate = 0
+        self.ultimul_frame = time.monotonic()
+        self._start = time.monotonic()
+
+    # Apelat o data pe frame, cu FPS-ul mediu al buclei
+    def frame(self, fps):
+        self.frame_uri += 1
+        self.fps = fps
+        self.ultimul_frame = time.monotonic()
+
+    # Apelat dupa fiecare inferenta, cu durata ei si clasele detectiilor pastrate
+    def inferenta(self, ms, boxes_cls):
+        self.inferente += 1
+        self.ms_inferenta = ms
+        np.add.at(self.detectii, boxes_cls, 1)
+
+    def sms_pus_in_coada(self, numar=1):
+        self.sms_in_coada += numar
+
+    # Functie potrivita pentru la_rezultat din SmsDispatcher (apelata din firul dispecerului)
+    def sms_rezultat(self, rezultat):
+        if rezultat.trimis:
+            self.sms_trimise += 1
+        else:
+            self.sms_esuate += 1
+
+    # Secunde de la ultimul frame procesat (pentru /health)
+    def varsta_frame(self):
+        return time.monotonic() - self.ultimul_frame
+
+    # Toate metricile in formatul text Prometheus
+    def text_prometheus(self):
+        linii = []
+
+        def metrica(nume, tip, descriere, valori):
+            linii.append(f'# HELP detector_{nume} {descriere}')
+            linii.append(f'# TYPE detector_{nume} {tip}')
+            for etichete, valoare in valori:
+                if valoare is not None:
+                    linii.append(f'detector_{nume}{etichete} {valoare}')
+
+        metrica('fps', 'gauge', 'FPS-ul mediu al buclei de detectie', [('', round(float(self.fps), 3))])
+        metrica('inferenta_ms', 'gauge', 'Durata ultimei inferente', [('', round(self.ms_inferenta, 3))])
+        metrica('frame_uri_total', 'counter', 'Frame-uri procesate', [('', self.frame_uri)])
+        metrica('inferente_total', 'counter', 'Inferente rulate', [('', self.inferente)])
+        metrica('frame_uri_pierdute_total', 'counter', 'Frame-uri aruncate de captura (consumator prea lent)',
+                [('', getattr(self.captura, 'frame_uri_pierdute', 0))])
+        metrica('frame_uri_fara_miscare_total', 'counter', 'Frame-uri fara miscare, pe care inferenta a fost sarita',
+                [('', getattr(self.poarta_miscare, 'frame_uri_sarite', 0))])
+        metrica('detectii_total', 'counter', 'Detectii peste prag, pe clasa',
+                [(f'{{clasa="{nume}"}}', int(self.detectii[idx])) for idx, nume in self.labels.items()])
+        pozitie = self.gps.ultima_pozitie() if self.gps is not None else None
+        metrica('gps_varsta_fix_secunde', 'gauge', 'Varsta ultimului fix GPS valid',
+                [('', None if pozitie is None else round(pozitie.varsta, 3))])
+        metrica('gps_calitate_fix', 'gauge', 'Calitatea fix-ului GPS din GGA (0 = fara fix)',
+                [('', 0 if pozitie is None else pozitie.calitate)])
+        metrica('gps_hdop', 'gauge', 'HDOP-ul ultimului fix', [('', None if pozitie is None else pozitie.hdop)])
+        metrica('gps_sateliti', 'gauge', 'Sateliti folositi in ultimul fix',
+                [('', None if pozitie is None else pozitie.sateliti)])
+        metrica('sms_in_coada_total', 'counter', 'SMS-uri puse in coada dispecerului', [('', self.sms_in_coada)])
+        metrica('sms_trimise_total', 'counter', 'SMS-uri trimise cu succes', [('', self.sms_trimise)])
+        metrica('sms_esuate_total', 'counter', 'SMS-uri netrimise dupa toate reincercarile', [('', self.sms_esuate)])
+        metrica('temperatura_cpu_celsius', 'gauge', 'Temperatura procesorului', [('', temperatura_cpu())])
+        metrica('uptime_secunde', 'gauge', 'Secunde de la pornirea detectorului',
+                [('', round(time.monotonic() - self._start, 1))])
+        return '\n'.join(linii) + '\n'
+
+
+# Server HTTP local: /metrics intoarce textul Prometheus, /health raspunde 200 daca bucla a procesat
+# un frame in ultimele max_fara_frame secunde, altfel 503
+# Implicit serverul asculta doar pe 127.0.0.1: metricile contin pozitia GPS si starea alertelor
+class ServerMetrici(threading.Thread):
+    def __init__(self, metrici, port=9100, adresa='127.0.0.1', max_fara_frame=30.0):
+        super().__init__(daemon=True)
+        self.metrici = metrici
+        self.max_fara_frame = max_fara_frame
+        server = self
+
+        class Cerere(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith('/metrics'):
+                    self._raspunde(200, server.metrici.text_prometheus(), 'text/plain; version=0.0.4')
+                elif self.path.startswith('/health'):
+                    varsta = server.metrici.varsta_frame()
+                    if varsta <= server.max_fara_frame:
+                        self._raspunde(200, f'ok, ultimul frame acum {varsta:.1f} s\n', 'text/plain')
+                    else:
+                        self._raspunde(503, f'blocat, niciun frame de {varsta:.1f} s\n', 'text/plain')
+                else:
+                    self._raspunde(404, 'Cai disponibile: /metrics, /health\n', 'text/plain')
+
+            def _raspunde(self, cod, text, tip):
+                corp = text.encode()
+                self.send_response(cod)
+                self.send_header('Content-Type', tip)
+                self.send_header('Content-Length', str(len(corp)))
+                self.end_headers()
+                self.wfile.write(corp)
+
+            def log_message(self, format, *args):
+                pass                     # Fara o linie in consola pentru fiecare cerere
+
+        self._http = ThreadingHTTPServer((adresa, port), Cerere)
+
+    def run(self):
+        self._http.serve_forever()
+
+    def stop(self):
+        self._http.shutdown()
+        self._http.server_close()
+
+
+# Rescrie periodic fisierul de metrici; scrierea se face intr-un fisier temporar inlocuit atomic,
+# deci cine citeste fisierul nu vede niciodata un continut partial
+class FisierMetrici(threading.Thread):
+    def __init__(self, metrici, cale, interval=10.0):
+        super().__init__(daemon=True)
+        self.metrici = metrici
+        self.cale = cale
+        self.interval = interval
+        self._oprit = threading.Event()
+
+    def run(self):
+        while not self._oprit.wait(self.interval):
+            self.scrie()
+
+    def scrie(self):
+        temporar = self.cale + '.tmp'
+        with open(temporar, 'w') as f:
+            f.write(self.metrici.text_prometheus())
+        os.replace(temporar, self.cale)
+
+    def stop(self):
+        self._oprit.set()
+        self.scrie()
+
+
+# Durata etapelor buclei de detectie, scrisa cate un rand JSON pe frame (folosita de benchmark.py)
+# Fara fisier (cale None) metodele nu fac nimic, deci bucla le poate apela mereu
+class ProfilEtape:
+    def __init__(self, cale=None, **informatii):
+        self._f = open(cale, 'w') if cale else None
+        self._t = 0.0
+        self._etape = {}
+        if self._f is not None:
+            self._f.write(json.dumps(informatii) + '\n')
+
+    # Inceputul unui frame
+    def inceput(self):
+        if self._f is not None:
+            self._etape = {}
+            self._t = time.perf_counter()
+
+    # Sfarsitul etapei cu numele dat: timpul scurs de la etapa anterioara, in milisecunde
+    def etapa(self, nume):
+        if self._f is not None:
+            acum = time.perf_counter()
+            self._etape[nume] = self._etape.get(nume, 0.0) + (acum - self._t) * 1000
+            self._t = acum
+
+    # Sfarsitul frame-ului; detectie: daca pe acest frame a rulat modelul
+    def sfarsit(self, detectie):
+        if self._f is not None:
+            self._f.write(json.dumps({'etape': self._etape, 'detectie': bool(detectie)}) + '\n')
+
+    def inchide(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
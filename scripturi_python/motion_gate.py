@@ -0,0 +1,47 @@
+# Filtru de miscare inaintea inferentei YOLO
+# Intr-o camera fixa din padure majoritatea frame-urilor sunt statice. Pe o copie mica, in tonuri de gri,
+# a fiecarui frame se verifica daca scena s-a schimbat (diferenta fata de frame-ul anterior sau scaderea
+# fundalului cu MOG2); modelul ruleaza doar la miscare, plus o inferenta fortata la fiecare K frame-uri.
+
+import cv2               # Pentru redimensionare, conversie in gri si detectia miscarii
+
+
+class MotionGate:
+    # sensibilitate: fractiunea minima de pixeli schimbati (0-1) considerata miscare
+    # keepalive: dupa cate frame-uri fara inferenta se ruleaza oricum modelul
+    # latime: latimea copiei micsorate pe care se face comparatia; metoda: 'diferenta' sau 'mog2'
+    def __init__(self, sensibilitate=0.01, keepalive=30, latime=160, metoda='diferenta'):
+        self.sensibilitate = sensibilitate
+        self.keepalive = keepalive
+        self.latime = latime
+        self.metoda = metoda
+        self.frame_uri_sarite = 0
+        self._anterior = None
+        self._fara_inferenta = 0
+        if metoda == 'mog2':
+            self._fundal = cv2.createBackgroundSubtractorMOG2(history=200, varThreshold=25, detectShadows=False)
+
+    # Intoarce True daca pe frame-ul curent trebuie rulat modelul
+    def trebuie_inferenta(self, frame):
+        miscare = self.are_miscare(frame)
+        if miscare or self._fara_inferenta + 1 >= self.keepalive:
+            self._fara_inferenta = 0
+            return True
+        self._fara_inferenta += 1
+        self.frame_uri_sarite += 1
+        return False
+
+    # Compara copia micsorata a frame-ului cu cea anterioara (sau cu modelul de fundal)
+    def are_miscare(self, frame):
+        inaltime = max(1, frame.shape[0] * self.latime // frame.shape[1])
+        mic = cv2.resize(frame, (self.latime, inaltime), interpolation=cv2.INTER_AREA)
+        gri = cv2.GaussianBlur(cv2.cvtColor(mic, cv2.COLOR_BGR2GRAY), (5, 5), 0)
+        if self.metoda == 'mog2':
+            masca = self._fundal.apply(gri)
+        else:
+            if self._anterior is None or self._anterior.shape != gri.shape:
+                self._anterior = gri
+                return True
+            _, masca = cv2.threshold(cv2.absdiff(gri, self._anterior), 25, 255, cv2.THRESH_BINARY)
+            self._anterior = gri
+        return cv2.countNonZero(masca) > self.sensibilitate * masca.size
@@ -0,0 +1,74 @@
+# Parsare rapida a mesajelor NMEA de la GPS
+# Se lucreaza direct pe bytes, fara decodare si fara pynmea2: se verifica suma de control si se extrag
+# doar campurile folosite (pozitie, calitatea fix-ului, HDOP, numarul de sateliti, ora UTC) din mesajele
+# GGA si RMC, indiferent de emitator (GP - GPS, GL - GLONASS, GN - mai multe constelatii, GA, BD).
+
+import datetime          # Pentru ora UTC a mesajului
+from collections import namedtuple
+from functools import reduce
+from operator import xor
+
+# Un mesaj GGA sau RMC parsat. tip: 'GGA' sau 'RMC'; calitate: calitatea fix-ului din GGA (0 = fara fix,
+# 1 = GPS, 2 = DGPS...), None pentru RMC; hdop si sateliti doar pentru GGA; valid: fix utilizabil
+# (calitate > 0 la GGA, status 'A' la RMC). lat/lon sunt None daca mesajul nu contine pozitie.
+MesajNmea = namedtuple('MesajNmea', ['emitator', 'tip', 'lat', 'lon', 'calitate', 'hdop', 'sateliti', 'utc', 'valid'])
+
+EMITATORI = (b'GP', b'GN', b'GL', b'GA', b'BD', b'GB')
+
+
+# Verifica suma de control: XOR pe toti octetii dintre '$' si '*', comparat cu cele doua cifre hexa
+def checksum_valid(linie):
+    stea = linie.rfind(b'*')
+    if not linie.startswith(b'$') or stea < 0 or len(linie) < stea + 3:
+        return False
+    try:
+        asteptat = int(linie[stea + 1:stea + 3], 16)
+    except ValueError:
+        return False
+    return reduce(xor, linie[1:stea], 0) == asteptat
+
+
+# Transforma 'ddmm.mmmm' / 'dddmm.mmmm' si emisfera (N/S/E/W) in grade zecimale
+def _grade(valoare, emisfera):
+    if not valoare:
+        return None
+    punct = valoare.find(b'.')
+    if punct < 0:
+        punct = len(valoare)
+    grade = int(valoare[:punct - 2]) + float(valoare[punct - 2:]) / 60
+    return -grade if emisfera in (b'S', b'W') else grade
+
+
+def _utc(valoare):
+    if len(valoare) < 6:
+        return None
+    secunde = float(valoare[4:])
+    return datetime.time(int(valoare[:2]), int(valoare[2:4]), int(secunde), int(secunde % 1 * 1e6))
+
+
+# Parseaza o linie NMEA (bytes, cu sau fara '\r\n'); intoarce MesajNmea pentru GGA/RMC sau None
+# pentru alte mesaje, linii corupte sau suma de control gresita
+def parseaza(linie):
+    linie = linie.strip()
+    if len(linie) < 7 or linie[3:6] not in (b'GGA', b'RMC') or linie[1:3] not in EMITATORI:
+        return None
+    if not checksum_valid(linie):
+        return None
+    campuri = linie[:linie.rfind(b'*')].split(b',')
+    emitator = linie[1:3].decode()
+    try:
+        if linie[3:6] == b'GGA':
+            if len(campuri) < 9:
+                return None
+            lat, lon = _grade(campuri[2], campuri[3]), _grade(campuri[4], campuri[5])
+            calitate = int(campuri[6] or 0)
+            return MesajNmea(emitator, 'GGA', lat, lon, calitate, float(campuri[8]) if campuri[8] else None,
+                             int(campuri[7]) if campuri[7] else None, _utc(campuri[1]),
+                             calitate > 0 and lat is not None and lon is not None)
+        if len(campuri) < 7:
+            return None
+        lat, lon = _grade(campuri[3], campuri[4]), _grade(campuri[5], campuri[6])
+        return MesajNmea(emitator, 'RMC', lat, lon, None, None, None, _utc(campuri[1]),
+                         campuri[2] == b'A' and lat is not None and lon is not None)
+    except ValueError:
+        return None
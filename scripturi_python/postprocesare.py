@@ -0,0 +1,41 @@
+# Post-procesarea detectiilor YOLO
+# Coordonatele, scorurile si clasele sunt preluate o singura data pe frame ca array-uri NumPy
+# (un singur transfer de pe dispozitiv), iar filtrarea dupa prag si clasa se face cu o masca,
+# in loc de cate un acces la tensor pentru fiecare box.
+
+import cv2               # Pentru desenarea bounding box-urilor
+import numpy as np       # Pentru filtrarea vectorizata a detectiilor
+
+
+# boxes: results[0].boxes de la Ultralytics; clase: lista optionala de indici de clasa acceptati
+# Intoarce (xyxy int Nx4, conf N, cls int N) doar pentru detectiile cu scor peste min_thresh
+def extrage_detectii(boxes, min_thresh, clase=None):
+    date = boxes.data.cpu().numpy()        # Coloane: xmin, ymin, xmax, ymax, conf, cls
+    conf = date[:, 4]
+    cls = date[:, 5].astype(int)
+    masca = conf > min_thresh
+    if clase is not None:
+        masca &= np.isin(cls, clase)
+    return date[masca, :4].astype(int), conf[masca], cls[masca]
+
+
+# Intoarce indicii claselor care au numele dat (ex. "urs"), fara diferenta intre litere mari si mici
+def indici_clasa(labels, nume):
+    return [idx for idx, eticheta in labels.items() if eticheta.lower() == nume.lower()]
+
+
+# Deseneaza pe frame bounding box-urile si etichetele (clasa si scorul) detectiilor filtrate
+def deseneaza_detectii(frame, boxes_xyxy, boxes_conf, boxes_cls, labels, culori):
+    for (xmin, ymin, xmax, ymax), conf, classidx in zip(boxes_xyxy, boxes_conf, boxes_cls):
+        color = culori[classidx % len(culori)]
+        cv2.rectangle(frame, (xmin,ymin), (xmax,ymax), color, 2)
+        label = f'{labels[classidx]}: {int(conf*100)}%'
+        labelSize, baseLine = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
+        label_ymin = max(ymin, labelSize[1] + 10)
+        cv2.rectangle(frame, (xmin, label_ymin-labelSize[1]-10), (xmin+labelSize[0], label_ymin+baseLine-10), color, cv2.FILLED)
+        cv2.putText(frame, label, (xmin, label_ymin-7), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 1)
+
+
+# Rezultatul unui frame pe care modelul nu a rulat: nicio detectie
+def detectii_goale():
+    return np.zeros((0, 4), dtype=int), np.zeros(0, dtype=np.float32), np.zeros(0, dtype=int)
@@ -0,0 +1,91 @@
+# Decodarea in avans a imaginilor dintr-un folder, pe mai multe fire
+# Cat timp modelul ruleaza pe imaginea curenta, urmatoarele K imagini sunt deja decodate in paralel
+# (cv2.imread elibereaza GIL-ul). Daca imaginile vor fi oricum micsorate la --resolution, fisierele JPEG
+# mari sunt decodate direct la 1/2, 1/4 sau 1/8 din rezolutie (IMREAD_REDUCED_*), mai repede si cu mai
+# putina memorie decat decodarea completa a unei fotografii de 20 MP. Factorul este ales din dimensiunea
+# scrisa in antetul JPEG, fara o decodare in plus. Celelalte formate (PNG, BMP) sunt decodate complet,
+# deoarece pentru ele OpenCV decodeaza oricum toata imaginea si abia apoi o micsoreaza.
+
+import os                # Pentru numarul de nuclee si extensia fisierelor
+import struct            # Pentru citirea dimensiunii din antetul JPEG
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2               # Pentru decodarea imaginilor
+
+# Factorul de reducere si flag-ul OpenCV corespunzator
+REDUCERI = [(8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4), (2, cv2.IMREAD_REDUCED_COLOR_2)]
+EXTENSII_JPEG = ('.jpg', '.jpeg')
+
+
+# Dimensiunea (latime, inaltime) scrisa in antetul unui fisier JPEG (segmentul SOF), fara decodarea imaginii;
+# None daca fisierul nu este un JPEG valid
+def dimensiune_jpeg(cale):
+    try:
+        with open(cale, 'rb') as f:
+            if f.read(2) != b'\xff\xd8':
+                return None
+            while True:
+                marker = f.read(2)
+                while len(marker) == 2 and marker[0] == 0xFF and marker[1] == 0xFF:
+                    marker = marker[1:] + f.read(1)   # Octeti de umplere intre segmente
+                if len(marker) < 2 or marker[0] != 0xFF:
+                    return None
+                tip = marker[1]
+                if tip == 0x01 or 0xD0 <= tip <= 0xD7:
+                    continue                          # Markeri fara lungime
+                lungime = struct.unpack('>H', f.read(2))[0]
+                # SOF0-SOF15, fara DHT (C4), JPG (C8) si DAC (CC)
+                if 0xC0 <= tip <= 0xCF and tip not in (0xC4, 0xC8, 0xCC):
+                    _, inaltime, latime = struct.unpack('>BHH', f.read(5))
+                    return latime, inaltime
+                f.seek(lungime - 2, 1)
+    except (OSError, struct.error):
+        return None
+
+
+class ImagePrefetcher:
+    # cai: lista imaginilor, in ordinea in care vor fi citite; marime: cate imagini sunt decodate in avans
+    # rezolutie: (latime, inaltime) la care vor fi redimensionate imaginile, pentru decodarea redusa (optional)
+    def __init__(self, cai, marime=4, fire=None, rezolutie=None):
+        self.cai = list(cai)
+        self.marime = max(1, marime)
+        self.rezolutie = rezolutie
+        self._executor = ThreadPoolExecutor(max_workers=fire or min(4, os.cpu_count() or 1))
+        self._in_lucru = deque()
+        self._urmatoarea = 0
+        while len(self._in_lucru) < self.marime and self._urmatoarea < len(self.cai):
+            self._programeaza()
+
+    def _programeaza(self):
+        self._in_lucru.append(self._executor.submit(self._decodeaza, self.cai[self._urmatoarea]))
+        self._urmatoarea += 1
+
+    # Decodeaza o imagine; pentru JPEG cu rezolutie data foloseste cea mai mare reducere care nu coboara sub ea
+    def _decodeaza(self, cale):
+        if self.rezolutie is None or os.path.splitext(cale)[1].lower() not in EXTENSII_JPEG:
+            return cv2.imread(cale)
+        dimensiune = dimensiune_jpeg(cale)
+        if dimensiune is None:
+            return cv2.imread(cale)
+        # imread roteste imaginea dupa orientarea EXIF, deci laturile sunt comparate independent de orientare
+        mare, mic = max(dimensiune), min(dimensiune)
+        tinta_mare, tinta_mic = max(self.rezolutie), min(self.rezolutie)
+        for factor, flag in REDUCERI:
+            if mare // factor >= tinta_mare and mic // factor >= tinta_mic:
+                return cv2.imread(cale, flag)
+        return cv2.imread(cale)
+
+    # Intoarce urmatoarea imagine decodata (None daca nu poate fi citita) si programeaza urmatoarea din lista
+    def citeste(self):
+        if not self._in_lucru:
+            return None
+        frame = self._in_lucru.popleft().result()
+        if self._urmatoarea < len(self.cai):
+            self._programeaza()
+        return frame
+
+    def inchide(self):
+        for viitor in self._in_lucru:
+            viitor.cancel()
+        self._executor.shutdown(wait=True)
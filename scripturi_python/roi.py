@@ -0,0 +1,64 @@
+# Zona de interes (ROI) si zonele excluse pentru fiecare camera
+# Configuratia este un fisier JSON cu poligonul zonei de interes si poligoanele excluse, in pixeli sau,
+# cu "normalizat": true, ca fractiuni (0-1) din latimea si inaltimea frame-ului:
+#   {"roi": [[x, y], ...], "excluderi": [[[x, y], ...], ...], "normalizat": true}
+# Modelul ruleaza doar pe dreptunghiul care incadreaza ROI-ul (imagine mai mica, inferenta mai rapida),
+# iar detectiile cu centrul in afara ROI-ului sau intr-o zona exclusa (cer, obiecte fixe) sunt eliminate.
+
+import json              # Pentru citirea configuratiei
+
+import cv2               # Pentru testul punct-in-poligon
+import numpy as np       # Pentru poligoane si box-uri
+
+
+class ZonaInteres:
+    # roi: lista de puncte [x, y] sau None (tot frame-ul); excluderi: lista de poligoane
+    # normalizat: coordonatele sunt fractiuni din latimea/inaltimea frame-ului
+    def __init__(self, roi=None, excluderi=(), normalizat=False):
+        self.roi = None if roi is None else np.asarray(roi, dtype=np.float32)
+        self.excluderi = [np.asarray(poligon, dtype=np.float32) for poligon in excluderi]
+        self.normalizat = normalizat
+        self._forma = None
+
+    @classmethod
+    def din_fisier(cls, cale):
+        with open(cale) as f:
+            config = json.load(f)
+        return cls(config.get('roi'), config.get('excluderi', []), config.get('normalizat', False))
+
+    # Calculeaza o singura data pentru fiecare rezolutie poligoanele in pixeli si dreptunghiul ROI-ului
+    def _pregateste(self, forma):
+        if forma[:2] == self._forma:
+            return
+        inaltime, latime = forma[:2]
+        scara = np.array([latime, inaltime], dtype=np.float32) if self.normalizat else np.ones(2, dtype=np.float32)
+        self._roi_px = None if self.roi is None else (self.roi * scara).reshape(-1, 1, 2)
+        self._excluderi_px = [(poligon * scara).reshape(-1, 1, 2) for poligon in self.excluderi]
+        if self._roi_px is None:
+            self._dreptunghi = (0, 0, latime, inaltime)
+        else:
+            x, y, w, h = cv2.boundingRect(self._roi_px.astype(np.int32))
+            x0, y0 = max(0, x), max(0, y)
+            self._dreptunghi = (x0, y0, min(latime, x + w), min(inaltime, y + h))
+        self._forma = forma[:2]
+
+    # Intoarce decupajul frame-ului la dreptunghiul ROI-ului (fara copiere) si coltul lui (x0, y0)
+    def decupeaza(self, frame):
+        self._pregateste(frame.shape)
+        x0, y0, x1, y1 = self._dreptunghi
+        return frame[y0:y1, x0:x1], (x0, y0)
+
+    # Pastreaza doar detectiile cu centrul in ROI si in afara zonelor excluse (coordonate in frame-ul dat)
+    def filtreaza(self, boxes_xyxy, boxes_conf, boxes_cls, forma):
+        self._pregateste(forma)
+        if len(boxes_conf) == 0 or (self._roi_px is None and not self._excluderi_px):
+            return boxes_xyxy, boxes_conf, boxes_cls
+        centre = (boxes_xyxy[:, :2] + boxes_xyxy[:, 2:]) / 2
+        pastrate = np.ones(len(centre), dtype=bool)
+        for i, (cx, cy) in enumerate(centre):
+            punct = (float(cx), float(cy))
+            if self._roi_px is not None and cv2.pointPolygonTest(self._roi_px, punct, False) < 0:
+                pastrate[i] = False
+            elif any(cv2.pointPolygonTest(poligon, punct, False) >= 0 for poligon in self._excluderi_px):
+                pastrate[i] = False
+        return boxes_xyxy[pastrate], boxes_conf[pastrate], boxes_cls[pastrate]
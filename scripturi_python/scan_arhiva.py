@@ -0,0 +1,138 @@
+# Scanarea neinteractiva a unei arhive mari de imagini de la camerele de padure
+# Folderul este parcurs recursiv, imaginile sunt impartite intre mai multe procese (fiecare cu propriul
+# model YOLO), iar detectiile sunt scrise pe masura ce apar intr-un raport CSV sau JSONL. Fisierele deja
+# scanate sunt trecute intr-un manifest, astfel incat o scanare intrerupta poate fi reluata de unde a ramas.
+
+import os                # Pentru parcurgerea folderelor
+import sys               # Pentru terminarea programului in caz de eroare
+import csv               # Pentru raportul CSV
+import json              # Pentru raportul JSONL
+import time              # Pentru viteza de scanare
+import argparse          # Pentru parsarea argumentelor din linia de comanda
+import multiprocessing   # Pentru procesele care ruleaza modelul in paralel
+
+img_ext_list = ['.jpg','.JPG','.jpeg','.JPEG','.png','.PNG','.bmp','.BMP']
+
+# Modelul fiecarui proces, incarcat o singura data in initializare
+_model = None
+_min_thresh = None
+
+
+# Initializarea unui proces: limiteaza firele de calcul si incarca modelul
+def _initializeaza(model_path, backend_ales, min_thresh, fire):
+    global _model, _min_thresh
+    # Fiecare proces foloseste putine fire, ca procesele sa nu concureze pe aceleasi nuclee
+    os.environ['OMP_NUM_THREADS'] = str(fire)
+    import cv2
+    cv2.setNumThreads(fire)
+    from backend import incarca_model
+    _, _model = incarca_model(model_path, backend_ales)
+    _min_thresh = min_thresh
+
+
+# Ruleaza modelul pe o imagine si intoarce detectiile ei (sau eroarea)
+# O eroare la o imagine ajunge in raport, fara sa opreasca scanarea intregii arhive
+def _scaneaza(cale):
+    try:
+        return _detecteaza(cale)
+    except Exception as e:
+        return {'fisier': cale, 'eroare': f'{type(e).__name__}: {e}', 'detectii': []}
+
+
+def _detecteaza(cale):
+    import cv2
+    from postprocesare import extrage_detectii
+    if _model is None:
+        return {'fisier': cale, 'eroare': 'modelul nu a putut fi incarcat in proces', 'detectii': []}
+    frame = cv2.imread(cale)
+    if frame is None:
+        return {'fisier': cale, 'eroare': 'imaginea nu poate fi citita', 'detectii': []}
+    results = _model(frame, verbose=False)
+    boxes_xyxy, boxes_conf, boxes_cls = extrage_detectii(results[0].boxes, _min_thresh)
+    detectii = [{'clasa': _model.names[int(c)], 'conf': round(float(p), 4), 'box': [int(v) for v in box]}
+                for box, p, c in zip(boxes_xyxy, boxes_conf, boxes_cls)]
+    return {'fisier': cale, 'latime': frame.shape[1], 'inaltime': frame.shape[0], 'detectii': detectii}
+
+
+# Toate imaginile din folder si subfoldere, in ordine stabila
+def cauta_imagini(folder):
+    imagini = []
+    for radacina, _, fisiere in os.walk(folder):
+        for fisier in fisiere:
+            if os.path.splitext(fisier)[1] in img_ext_list:
+                imagini.append(os.path.join(radacina, fisier))
+    return sorted(imagini)
+
+
+# Scrie rezultatul unei imagini: in CSV cate un rand pe detectie (sau un rand gol), in JSONL un rand pe imagine
+def scrie_rezultat(f, scriitor_csv, rezultat):
+    if scriitor_csv is None:
+        f.write(json.dumps(rezultat) + '\n')
+        return
+    if not rezultat['detectii']:
+        scriitor_csv.writerow([rezultat['fisier'], '', '', '', '', '', '', rezultat.get('eroare', '')])
+    for d in rezultat['detectii']:
+        scriitor_csv.writerow([rezultat['fisier'], d['clasa'], d['conf']] + d['box'] + [''])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--model', help='Calea catre modelul YOLO (exemplu: "best.pt")', required=True)
+    parser.add_argument('--source', help='Folderul arhivei; subfolderele sunt parcurse si ele', required=True)
+    parser.add_argument('--output', help='Raportul: .csv (un rand pe detectie) sau .jsonl (un rand pe imagine)',
+                        default='raport_scanare.csv')
+    parser.add_argument('--manifest', help='Fisierul cu imaginile deja scanate (implicit <output>.manifest)', default=None)
+    parser.add_argument('--workers', help='Numarul de procese (implicit numarul de nuclee)', default=os.cpu_count())
+    parser.add_argument('--threads', help='Fire de calcul pentru fiecare proces (implicit 1)', default=1)
+    parser.add_argument('--thresh', help='Prag minim de incredere', default=0.5)
+    parser.add_argument('--backend', help='Backend de inferenta (pytorch, onnx, openvino, ncnn...; auto masoara in fiecare proces)',
+                        default='pytorch')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model):
+        print('EROARE: Calea catre model este invalida sau modelul nu a fost gasit.')
+        sys.exit(0)
+    if not os.path.isdir(args.source):
+        print(f'Folderul {args.source} nu exista.')
+        sys.exit(0)
+    # Backend-ul este verificat o singura data aici, nu in fiecare proces dupa pornirea scanarii
+    from backend import artefacte_disponibile
+    if args.backend != 'auto' and args.backend not in [nume for nume, _ in artefacte_disponibile(args.model)]:
+        print(f'Backend-ul {args.backend} nu a fost exportat pentru acest model sau runtime-ul nu este instalat. Ruleaza export_model.py.')
+        sys.exit(0)
+
+    # Reluarea: imaginile din manifest au fost deja scrise in raport
+    manifest = args.manifest or args.output + '.manifest'
+    scanate = set()
+    if os.path.exists(manifest):
+        with open(manifest) as f:
+            scanate = set(linie.rstrip('\n') for linie in f)
+    imagini = [cale for cale in cauta_imagini(args.source) if cale not in scanate]
+    print(f'{len(imagini)} imagini de scanat ({len(scanate)} deja scanate).')
+    if not imagini:
+        return
+
+    este_csv = not args.output.endswith('.jsonl')
+    raport_nou = not os.path.exists(args.output)
+    workers = int(args.workers)
+    t_start = time.perf_counter()
+    with open(args.output, 'a', newline='') as f_raport, open(manifest, 'a') as f_manifest, \
+            multiprocessing.Pool(workers, initializer=_initializeaza,
+                                 initargs=(args.model, args.backend, float(args.thresh), int(args.threads))) as pool:
+        scriitor_csv = csv.writer(f_raport) if este_csv else None
+        if este_csv and raport_nou:
+            scriitor_csv.writerow(['fisier', 'clasa', 'conf', 'xmin', 'ymin', 'xmax', 'ymax', 'eroare'])
+        # Rezultatele sunt scrise in ordinea terminarii; manifestul este actualizat dupa raport
+        for numar, rezultat in enumerate(pool.imap_unordered(_scaneaza, imagini, chunksize=4), start=1):
+            scrie_rezultat(f_raport, scriitor_csv, rezultat)
+            f_raport.flush()
+            f_manifest.write(rezultat['fisier'] + '\n')
+            f_manifest.flush()
+            if numar % 100 == 0 or numar == len(imagini):
+                viteza = numar / (time.perf_counter() - t_start)
+                print(f'{numar}/{len(imagini)} imagini, {viteza:.1f} imagini/s')
+    print(f'Raportul a fost salvat la {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+# Planificator pentru frecventa inferentei YOLO
+# Detectia ruleaza doar la fiecare N frame-uri, iar intre ele se pastreaza ultimele detectii. In modul
+# adaptiv N se recalculeaza din FPS-ul masurat al buclei, astfel incat in repaus detectia sa ruleze de
+# aproximativ frecventa_repaus ori pe secunda, iar dupa ce a fost vazut un urs sa ruleze pe fiecare frame.
+
+import time              # Pentru momentul ultimei detectii a unui urs
+
+
+class InferenceScheduler:
+    # pas: la cate frame-uri ruleaza detectia (fix, daca frecventa_repaus nu este data)
+    # frecventa_repaus: numarul tinta de detectii pe secunda cand nu este niciun urs (modul adaptiv)
+    # pas_max: limita superioara pentru N; memorie_urs: cate secunde dupa un urs se pastreaza rata maxima
+    def __init__(self, pas=1, frecventa_repaus=None, pas_max=30, memorie_urs=10.0):
+        self.pas = max(1, pas)
+        self.frecventa_repaus = frecventa_repaus
+        self.pas_max = pas_max
+        self.memorie_urs = memorie_urs
+        self._contor = 0
+        self._ultimul_urs = None
+
+    # Apelat o data pe frame; intoarce True daca pe acest frame trebuie rulata detectia
+    def trebuie_inferenta(self):
+        self._contor += 1
+        if self._contor >= self.pas:
+            self._contor = 0
+            return True
+        return False
+
+    # Apelat la finalul fiecarui frame cu FPS-ul mediu al buclei si daca a fost detectat un urs
+    def actualizeaza(self, fps_mediu, urs_detectat):
+        acum = time.monotonic()
+        if urs_detectat:
+            self._ultimul_urs = acum
+        if self.frecventa_repaus is None:
+            return
+        if self._ultimul_urs is not None and acum - self._ultimul_urs < self.memorie_urs:
+            # In timpul unei intalniri detectia ruleaza pe fiecare frame
+            self.pas = 1
+        elif fps_mediu > 0:
+            self.pas = int(min(self.pas_max, max(1, round(fps_mediu / self.frecventa_repaus))))
@@ -0,0 +1,288 @@
+# Inregistrarea si redarea traficului serial GPS/GSM, pentru rulare fara hardware
+# deschide_port() primeste in locul caii portului una dintre specificatiile:
+#   '/dev/ttyAMA3'                 - portul real (pySerial)
+#   'replay:captura.jsonl[@10]'    - reda o captura, in timp real sau accelerat (de 10 ori)
+#   'sim:gps', 'sim:gps_fara_fix'  - GPS simulat, cu fix valid sau fara fix
+#   'sim:modem', 'sim:modem_eroare', 'sim:modem_fara_raspuns' - modul SIM800L simulat
+# Cu inregistrare=<fisier>, toti octetii cititi si scrisi sunt salvati cu marcaj de timp (JSON pe linie).
+# Porturile simulate au aceeasi interfata folosita in proiect ca serial.Serial: read, readline, write,
+# in_waiting, reset_input_buffer, close.
+
+import heapq             # Datele programate, ordonate dupa momentul in care devin disponibile
+import json              # Formatul capturilor: un obiect JSON pe linie
+import threading         # Citirea poate astepta pana la scrierea unei comenzi din alt fir
+import time              # Pentru marcajele de timp si redarea in timp real
+from functools import reduce
+from operator import xor
+
+
+# Baza comuna: un buffer in care datele devin disponibile la momente programate
+class _PortSimulat:
+    def __init__(self, timeout=1, viteza=1.0):
+        self.timeout = timeout
+        self.viteza = viteza
+        self.is_open = True
+        self._cond = threading.Condition()
+        self._programate = []            # heap (moment, numar de ordine, date)
+        self._nr = 0
+        self._buffer = bytearray()
+        self._start = time.monotonic()
+
+    # Programeaza date care vor putea fi citite la momentul dat (time.monotonic); apelat sub _cond
+    def _programeaza(self, date, moment):
+        heapq.heappush(self._programate, (moment, self._nr, date))
+        self._nr += 1
+        self._cond.notify_all()
+
+    # Hook pentru subclase: programeaza datele urmatoare; apelat sub _cond
+    def _completeaza(self, acum):
+        pass
+
+    # Hook pentru subclase: raspunsul la o scriere; apelat sub _cond
+    def _la_scriere(self, date):
+        pass
+
+    # Muta in buffer datele al caror moment a trecut; intoarce momentul urmatoarelor date sau None
+    def _elibereaza(self):
+        acum = time.monotonic()
+        self._completeaza(acum)
+        while self._programate and self._programate[0][0] <= acum:
+            self._buffer += heapq.heappop(self._programate)[2]
+        return self._programate[0][0] if self._programate else None
+
+    # Asteapta (cel mult timeout) pana cand gata(buffer) intoarce pozitia pana la care se citeste
+    def _citeste_cand(self, gata):
+        limita = None if self.timeout is None else time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                urmator = self._elibereaza()
+                pozitie = gata(self._buffer)
+                acum = time.monotonic()
+                if pozitie or (limita is not None and acum >= limita):
+                    break
+                asteptari = [t - acum for t in (urmator, limita) if t is not None]
+                self._cond.wait(max(0.0, min(asteptari)) if asteptari else None)
+            pozitie = pozitie or len(self._buffer)
+            date = bytes(self._buffer[:pozitie])
+            del self._buffer[:pozitie]
+            return date
+
+    def read(self, size=1):
+        return self._citeste_cand(lambda b: size if len(b) >= size else 0)
+
+    def readline(self):
+        return self._citeste_cand(lambda b: b.find(b'\n') + 1)
+
+    def write(self, date):
+        with self._cond:
+            self._la_scriere(bytes(date))
+            self._cond.notify_all()
+        return len(date)
+
+    @property
+    def in_waiting(self):
+        with self._cond:
+            self._elibereaza()
+            return len(self._buffer)
+
+    def reset_input_buffer(self):
+        with self._cond:
+            self._elibereaza()
+            self._buffer.clear()
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.is_open = False
+
+
+# Reda o captura facuta cu inregistrare=. Datele primite de la dispozitiv sunt redate la aceeasi distanta
+# in timp (impartita la viteza) fata de ultima scriere care le preceda in captura, deci raspunsurile
+# modulului GSM vin abia dupa ce scriptul a trimis comanda corespunzatoare, iar mesajele GPS curg liber.
+class ReplaySerial(_PortSimulat):
+    def __init__(self, cale, viteza=1.0, timeout=1):
+        super().__init__(timeout, viteza)
+        self._rx = []                    # (scrieri necesare inainte, intarziere fata de ultima scriere, date)
+        scrieri, ancora = 0, 0.0
+        with open(cale) as f:
+            for linie in f:
+                if not linie.strip():
+                    continue
+                eveniment = json.loads(linie)
+                if eveniment['dir'] == 'tx':
+                    scrieri += 1
+                    ancora = eveniment['t']
+                else:
+                    self._rx.append((scrieri, eveniment['t'] - ancora, bytes.fromhex(eveniment['date'])))
+        self._urmator = 0
+        self._momente_scriere = [self._start]   # momentul scrierii numarul i (0 = pornirea redarii)
+        self._ultimul = self._start
+
+    def _la_scriere(self, date):
+        self._momente_scriere.append(time.monotonic())
+
+    def _completeaza(self, acum):
+        while self._urmator < len(self._rx):
+            scrieri, intarziere, date = self._rx[self._urmator]
+            if scrieri >= len(self._momente_scriere):
+                break
+            self._ultimul = max(self._ultimul, self._momente_scriere[scrieri] + intarziere / self.viteza)
+            self._programeaza(date, self._ultimul)
+            self._urmator += 1
+
+    # True dupa ce toate datele din captura au fost citite
+    @property
+    def terminat(self):
+        with self._cond:
+            self._elibereaza()
+            return self._urmator == len(self._rx) and not self._programate and not self._buffer
+
+
+# Adauga '*XX\r\n' cu suma de control NMEA
+def propozitie_nmea(corp):
+    return b'$%s*%02X\r\n' % (corp, reduce(xor, corp, 0))
+
+
+# GPS simulat: GGA si RMC la fiecare perioada; fara fix trimite GGA cu calitate 0 si RMC cu status 'V'
+class GpsSimulat(_PortSimulat):
+    def __init__(self, lat=45.642, lon=25.589, fix=True, perioada=1.0, viteza=1.0, timeout=1):
+        super().__init__(timeout, viteza)
+        self.lat, self.lon, self.fix = lat, lon, fix
+        self.perioada = perioada
+        self._urmatorul = self._start
+
+    def _completeaza(self, acum):
+        # Programeaza mereu si mesajul urmator, ca citirea sa stie cat are de asteptat
+        while self._urmatorul <= acum + self.perioada / self.viteza:
+            utc = time.strftime('%H%M%S', time.gmtime()).encode() + b'.00'
+            if self.fix:
+                lat = b'%02d%07.4f,%s' % (int(abs(self.lat)), abs(self.lat) % 1 * 60, b'N' if self.lat >= 0 else b'S')
+                lon = b'%03d%07.4f,%s' % (int(abs(self.lon)), abs(self.lon) % 1 * 60, b'E' if self.lon >= 0 else b'W')
+                gga = b'GPGGA,%s,%s,%s,1,08,0.9,545.4,M,46.9,M,,' % (utc, lat, lon)
+                rmc = b'GPRMC,%s,A,%s,%s,000.0,000.0,010125,,' % (utc, lat, lon)
+            else:
+                gga = b'GPGGA,%s,,,,,0,00,99.99,,,,,,' % utc
+                rmc = b'GPRMC,%s,V,,,,,,,010125,,' % utc
+            self._programeaza(propozitie_nmea(gga) + propozitie_nmea(rmc), self._urmatorul)
+            self._urmatorul += self.perioada / self.viteza
+
+
+# Modul SIM800L simulat. scenariu: 'ok' (SMS-urile sunt trimise), 'eroare' (AT+CMGS raspunde +CMS ERROR)
+# sau 'fara_raspuns' (modulul nu raspunde deloc). SMS-urile primite sunt pastrate in lista trimise.
+class ModemSimulat(_PortSimulat):
+    def __init__(self, scenariu='ok', intarziere_sms=1.0, viteza=1.0, timeout=2):
+        super().__init__(timeout, viteza)
+        self.scenariu = scenariu
+        self.intarziere_sms = intarziere_sms
+        self.trimise = []
+        self._ecou = True
+        self._comanda = b''
+        self._numar = None               # Destinatarul, cat timp se asteapta textul SMS-ului
+        self._referinta = 0
+
+    def _raspunde(self, date, intarziere=0.0):
+        if self.scenariu != 'fara_raspuns':
+            self._programeaza(date, time.monotonic() + intarziere / self.viteza)
+
+    def _la_scriere(self, date):
+        self._comanda += date
+        while True:
+            if self._numar is not None:
+                if b'\x1a' not in self._comanda:
+                    return
+                text, self._comanda = self._comanda.split(b'\x1a', 1)
+                if self.scenariu == 'eroare':
+                    self._raspunde(b'\r\n+CMS ERROR: 500\r\n', self.intarziere_sms)
+                else:
+                    self._referinta += 1
+                    self.trimise.append((self._numar, text.decode(errors='ignore')))
+                    self._raspunde(b'\r\n+CMGS: %d\r\n\r\nOK\r\n' % self._referinta, self.intarziere_sms)
+                self._numar = None
+                continue
+            if b'\r' not in self._comanda:
+                return
+            comanda, self._comanda = self._comanda.split(b'\r', 1)
+            comanda = comanda.strip()
+            if not comanda:
+                continue
+            ecou = comanda + b'\r' if self._ecou else b''
+            if comanda.upper() == b'ATE0':
+                self._ecou = False
+            if comanda.upper().startswith(b'AT+CMGS='):
+                self._numar = comanda.split(b'=', 1)[1].strip(b'"').decode(errors='ignore')
+                self._raspunde(ecou + b'\r\n> ')
+            elif comanda.upper().startswith(b'AT'):
+                self._raspunde(ecou + b'\r\nOK\r\n')
+            else:
+                self._raspunde(ecou + b'\r\nERROR\r\n')
+
+
+# Inregistreaza traficul unui port: fiecare citire ('rx') si scriere ('tx') devine o linie JSON
+# {"t": secunde de la deschidere, "dir": "rx"/"tx", "date": octetii in hexa}
+class SerialInregistrat:
+    def __init__(self, port, cale):
+        self.port = port
+        self._fisier = open(cale, 'w')
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+
+    def _scrie(self, directie, date):
+        if not date:
+            return
+        with self._lock:
+            if self._fisier.closed:
+                return
+            self._fisier.write(json.dumps({'t': round(time.monotonic() - self._start, 4), 'dir': directie,
+                                           'date': date.hex()}) + '\n')
+            self._fisier.flush()
+
+    def read(self, size=1):
+        date = self.port.read(size)
+        self._scrie('rx', date)
+        return date
+
+    def readline(self):
+        date = self.port.readline()
+        self._scrie('rx', date)
+        return date
+
+    def write(self, date):
+        self._scrie('tx', bytes(date))
+        return self.port.write(date)
+
+    def close(self):
+        self.port.close()
+        with self._lock:
+            self._fisier.close()
+
+    # Restul atributelor (in_waiting, reset_input_buffer, timeout...) sunt ale portului inregistrat
+    def __getattr__(self, nume):
+        return getattr(self.port, nume)
+
+
+SIMULATOARE = {
+    'gps': lambda timeout, viteza: GpsSimulat(fix=True, viteza=viteza, timeout=timeout),
+    'gps_fara_fix': lambda timeout, viteza: GpsSimulat(fix=False, viteza=viteza, timeout=timeout),
+    'modem': lambda timeout, viteza: ModemSimulat('ok', viteza=viteza, timeout=timeout),
+    'modem_eroare': lambda timeout, viteza: ModemSimulat('eroare', viteza=viteza, timeout=timeout),
+    'modem_fara_raspuns': lambda timeout, viteza: ModemSimulat('fara_raspuns', viteza=viteza, timeout=timeout),
+}
+
+
+# Deschide portul dupa specificatie (vezi inceputul fisierului); inregistrare: fisierul capturii (optional)
+def deschide_port(specificatie, baudrate=9600, timeout=1, inregistrare=None):
+    if specificatie.startswith('replay:'):
+        cale, _, viteza = specificatie[len('replay:'):].partition('@')
+        port = ReplaySerial(cale, float(viteza or 1), timeout)
+    elif specificatie.startswith('sim:'):
+        nume, _, viteza = specificatie[len('sim:'):].partition('@')
+        if nume not in SIMULATOARE:
+            raise ValueError(f'Simulator necunoscut: {nume} (disponibile: {", ".join(SIMULATOARE)})')
+        port = SIMULATOARE[nume](timeout, float(viteza or 1))
+    else:
+        import serial        # pySerial este necesar doar pentru porturile reale
+        port = serial.Serial(specificatie, baudrate, timeout=timeout)
+    if inregistrare:
+        port = SerialInregistrat(port, inregistrare)
+    return port
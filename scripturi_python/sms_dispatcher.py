@@ -0,0 +1,123 @@
+# Dispecer asincron pentru alertele SMS
+# Alertele sunt puse intr-o coada limitata, iar un fir de executie separat (singurul care foloseste
+# portul GSM) le trimite prin modulul SIM800L folosind motorul de comenzi AT din at_modem.py.
+# Modulul este initializat o singura data pe sesiune, iar trimiterile esuate sunt reincercate.
+# O alerta poate avea mai multi destinatari: SMS-urile sunt trimise unul dupa altul in aceeasi sesiune,
+# fiecare AT+CMGS pornind imediat dupa raspunsul celui anterior, iar rezultatul este raportat pe destinatar.
+
+import os                # Pentru verificarea fisierului cu destinatari
+import json              # Pentru citirea listei de destinatari
+import queue             # Coada limitata pentru alertele in asteptare
+import threading         # Pentru firul de executie care trimite SMS-urile
+import time              # Pentru timeout-urile de asteptare a raspunsurilor
+from collections import namedtuple
+
+from at_modem import ModemAT, ErroareAT, pune_cu_limita, MAX_EVENIMENTE
+
+# Rezultatul trimiterii unui SMS: referinta este numarul intors de '+CMGS: <ref>' (sau None)
+# eticheta este valoarea data la punerea in coada (de exemplu id-ul alertei din jurnal)
+RezultatSms = namedtuple('RezultatSms', ['numar', 'text', 'trimis', 'referinta', 'eroare', 'incercari', 'eticheta'])
+
+
+# Lista de destinatari dintr-un fisier JSON (lista de numere sau {"destinatari": [...]})
+# sau dintr-un text cu numere separate prin virgula; numerele duplicate sunt eliminate
+def citeste_destinatari(sursa):
+    if os.path.isfile(sursa):
+        with open(sursa) as f:
+            date = json.load(f)
+        if isinstance(date, dict):
+            date = date.get('destinatari', [])
+        numere = [str(numar) for numar in date]
+    elif sursa.endswith('.json'):
+        return []
+    else:
+        numere = sursa.split(',')
+    return list(dict.fromkeys(numar.strip() for numar in numere if numar.strip()))
+
+
+class SmsDispatcher(threading.Thread):
+    # ser: portul serial GSM deja deschis; numar_telefon: destinatarul implicit
+    # max_coada: cate alerte pot astepta (o alerta poate avea mai multi destinatari); peste limita sunt refuzate
+    # la_rezultat: functie apelata cu un RezultatSms dupa fiecare trimitere (implicit afiseaza in consola)
+    # la_urc: functie optionala pentru mesajele nesolicitate ale modulului (+CMTI, RING)
+    def __init__(self, ser, numar_telefon, max_coada=10, max_incercari=3, la_rezultat=None, la_urc=None):
+        super().__init__(daemon=True)
+        self.modem = ModemAT(ser, la_urc)
+        self.numar_telefon = numar_telefon
+        self.max_incercari = max_incercari
+        self.la_rezultat = la_rezultat or afiseaza_rezultat
+        self._coada = queue.Queue(maxsize=max_coada)
+        self.rezultate = queue.Queue(maxsize=MAX_EVENIMENTE)   # Ultimele rezultate, pentru cine vrea sa le citeasca
+
+    # Pune o alerta in coada si revine imediat; intoarce False daca coada este plina
+    def trimite(self, text, numar=None, eticheta=None):
+        return self.trimite_tuturor(text, [numar or self.numar_telefon], [eticheta])
+
+    # Pune in coada aceeasi alerta pentru mai multi destinatari; etichete (optional) are cate o valoare pe numar
+    def trimite_tuturor(self, text, numere, etichete=None):
+        etichete = etichete or [None] * len(numere)
+        try:
+            self._coada.put_nowait((text, list(zip(numere, etichete))))
+        except queue.Full:
+            return False
+        return True
+
+    def run(self):
+        while True:
+            try:
+                alerta = self._coada.get(timeout=1)
+            except queue.Empty:
+                # Cat timp nu sunt alerte, preia mesajele nesolicitate de la modul
+                self._protejat(self._citeste_urc)
+                continue
+            if alerta is None:
+                break
+            text, destinatari = alerta
+            # Acelasi mesaj catre fiecare destinatar, in aceeasi sesiune a modulului;
+            # o eroare la un destinatar nu ii opreste pe ceilalti
+            for numar, eticheta in destinatari:
+                self._protejat(self._trimite_catre, numar, text, eticheta)
+
+    # Opreste firul dupa ce alertele deja din coada au fost trimise
+    def stop(self, timeout=None):
+        self._coada.put(None)
+        self.join(timeout)
+
+    # Ruleaza un pas al firului; o eroare neasteptata (de exemplu in la_rezultat, care scrie in jurnalul SQLite)
+    # este afisata si firul continua, deoarece este singurul care foloseste modemul
+    def _protejat(self, functie, *argumente):
+        try:
+            functie(*argumente)
+        except Exception as e:
+            print(f'Eroare neasteptata in dispecerul SMS: {e!r}')
+
+    def _trimite_catre(self, numar, text, eticheta):
+        rezultat = self._trimite_cu_reincercari(numar, text)._replace(eticheta=eticheta)
+        pune_cu_limita(self.rezultate, rezultat)
+        self.la_rezultat(rezultat)
+
+    def _trimite_cu_reincercari(self, numar, text):
+        eroare = None
+        for incercare in range(1, self.max_incercari + 1):
+            try:
+                referinta = self.modem.trimite_sms(numar, text)
+                return RezultatSms(numar, text, True, referinta, None, incercare, None)
+            except (IOError, OSError, ErroareAT) as e:
+                eroare = str(e)
+                # Dupa o eroare modulul este reinitializat la urmatoarea incercare
+                self.modem.initializat = False
+                time.sleep(1)   # Lasa modulul sa revina inainte de reincercare
+        return RezultatSms(numar, text, False, None, eroare, self.max_incercari, None)
+
+    def _citeste_urc(self):
+        try:
+            self.modem.citeste_urc()
+        except (IOError, OSError):
+            pass
+
+
+def afiseaza_rezultat(rezultat):
+    if rezultat.trimis:
+        print(f"SMS trimis catre {rezultat.numar} (referinta {rezultat.referinta}):", rezultat.text)
+    else:
+        print(f"SMS netrimis catre {rezultat.numar} dupa {rezultat.incercari} incercari: {rezultat.eroare}")
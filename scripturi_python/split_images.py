@@ -1,86 +1,230 @@
 # Imparte un set de imagini in doua foldere: train si validation
+# Impartirea este reproductibila (amestecare cu --seed, apoi taiere in O(n)), fisierele sunt copiate, legate
+# (hardlink / symlink) sau mutate pe mai multe fire, iar la final este scris un manifest cu destinatia fiecarui fisier.
+# Cu --stratify adnotarile sunt citite o singura data, iar fiecare clasa si imaginile background sunt impartite
+# cat mai aproape de --train_pct. Fisierul classes.txt al datasetului este copiat langa train si validation,
+# unde il cauta dataset_index.py.
 
-from pathlib import Path     # Importa biblioteca pentru lucrul cu cai de fisiere
-import random               # Pentru selectie aleatoare a fisierelor
 import os                   # Pentru operatii cu sistemul de fisiere
 import sys                  # Pentru iesirea fortata din program
-import shutil               # Pentru copierea fisierelor
+import csv                  # Pentru manifestul impartirii
+import time                 # Pentru durata impartirii
+import random               # Pentru amestecarea reproductibila a fisierelor
+import shutil               # Pentru copierea si mutarea fisierelor
 import argparse             # Pentru parsarea argumentelor din linia de comanda
-
-# Defineste si parseaza argumentele introduse de utilizator
-
-parser = argparse.ArgumentParser()
-parser.add_argument('--datapath', help='Cale catre folderul cu date care contine fisierele de imagini si adnotari',
-                    required=True)
-parser.add_argument('--train_pct', help='Procentul de imagini care merg in folderul train; \
-                    restul merg in folderul de validare (exemplu: ".8")',
-                    default=.8)
-
-args = parser.parse_args()
-
-data_path = args.datapath
-train_percent = float(args.train_pct)
-
-# Verifica daca datele introduse sunt valide
-if not os.path.isdir(data_path):
-   print('Directorul specificat la --datapath nu a fost gasit. Verifica daca calea este corecta si incearca din nou.')
-   sys.exit(0)
-if train_percent < .01 or train_percent > 0.99:
-   print('Valoare invalida pentru train_pct. Introdu un numar intre .01 si .99.')
-   sys.exit(0)
-val_percent = 1 - train_percent
-
-# Defineste calea catre datasetul initial 
-input_image_path = os.path.join(data_path,'images')
-input_label_path = os.path.join(data_path,'labels')
-
-# Defineste caile catre folderele de imagini si adnotari pentru train si validation
-cwd = os.getcwd()
-train_img_path = os.path.join(cwd,'data/train/images')
-train_txt_path = os.path.join(cwd,'data/train/labels')
-val_img_path = os.path.join(cwd,'data/validation/images')
-val_txt_path = os.path.join(cwd,'data/validation/labels')
-
-# Creeaza folderele daca nu exista deja
-for dir_path in [train_img_path, train_txt_path, val_img_path, val_txt_path]:
-   if not os.path.exists(dir_path):
-      os.makedirs(dir_path)
-      print(f'Folder creat la {dir_path}.')
-
-# Obtine lista tuturor imaginilor si fisierelor de adnotari
-img_file_list = [path for path in Path(input_image_path).rglob('*')]
-txt_file_list = [path for path in Path(input_label_path).rglob('*')]
-
-print(f'Numar de fisiere imagine: {len(img_file_list)}')
-print(f'Numar de fisiere adnotare: {len(txt_file_list)}')
-
-# Determina numarul de fisiere care vor merge in fiecare folder
-file_num = len(img_file_list)
-train_num = int(file_num*train_percent)
-val_num = file_num - train_num
-print('Imagini mutate in train: %d' % train_num)
-print('Imagini mutate in validation: %d' % val_num)
-
-# Selecteaza fisierele aleator si le copiaza in folderele train sau validation
-for i, set_num in enumerate([train_num, val_num]):
-  for ii in range(set_num):
-    img_path = random.choice(img_file_list)
-    img_fn = img_path.name
-    base_fn = img_path.stem
-    txt_fn = base_fn + '.txt'
-    txt_path = os.path.join(input_label_path,txt_fn)
-
-    if i == 0: # Copiaza primul set de fisiere in folderele train
-      new_img_path, new_txt_path = train_img_path, train_txt_path
-    elif i == 1: # Copiaza al doilea set de fisiere in folderele de validare
-      new_img_path, new_txt_path = val_img_path, val_txt_path
-
-    shutil.copy(img_path, os.path.join(new_img_path,img_fn))
-    # Daca vrem sa mutam in loc sa copiem, decomentam linia de mai jos
-    #os.rename(img_path, os.path.join(new_img_path,img_fn))
-    if os.path.exists(txt_path): # Daca fisierul txt nu exista, inseamna ca e imagine background, deci nu copia fisier txt
-      shutil.copy(txt_path,os.path.join(new_txt_path,txt_fn))
-      # Daca vrem sa mutam fisierul txt in loc sa-l copiem, decomentam linia de mai jos
-      #os.rename(txt_path,os.path.join(new_txt_path,txt_fn))
-
-    img_file_list.remove(img_path)  # Scoate imaginea din lista pentru a nu o selecta din nou
+from collections import Counter  # Numarul de imagini pentru fiecare clasa
+from concurrent.futures import ThreadPoolExecutor  # Operatiile pe fisiere ruleaza in paralel
+
+img_ext_list = ['.jpg','.JPG','.jpeg','.JPEG','.png','.PNG','.bmp','.BMP']
+MODURI = ['copy', 'hardlink', 'symlink', 'move']
+
+
+# Toate imaginile din folder si subfoldere, sortate, ca aceeasi samanta sa dea mereu aceeasi impartire
+def cauta_imagini(folder):
+    imagini = []
+    for radacina, _, fisiere in os.walk(folder):
+        for fisier in fisiere:
+            if os.path.splitext(fisier)[1] in img_ext_list:
+                imagini.append(os.path.join(radacina, fisier))
+    return sorted(imagini)
+
+
+# Asociaza fiecarei imagini fisierul ei de adnotare (None pentru imaginile background, fara .txt)
+# Folderul labels este listat o singura data, in loc de un os.path.exists pentru fiecare imagine
+def asociaza_adnotari(imagini, folder_adnotari):
+    adnotari = set(os.listdir(folder_adnotari)) if os.path.isdir(folder_adnotari) else set()
+    perechi = []
+    for img_path in imagini:
+        txt_fn = os.path.splitext(os.path.basename(img_path))[0] + '.txt'
+        perechi.append((img_path, os.path.join(folder_adnotari, txt_fn) if txt_fn in adnotari else None))
+    return perechi
+
+
+# Amesteca perechile cu samanta data si le taie in train si validation
+def imparte_aleator(perechi, train_percent, seed):
+    perechi = list(perechi)
+    random.Random(seed).shuffle(perechi)
+    train_num = int(len(perechi) * train_percent)
+    return {'train': perechi[:train_num], 'validation': perechi[train_num:]}
+
+
+# Numarul de box-uri pentru fiecare clasa dintr-o adnotare YOLO ({} pentru imaginile background)
+def numara_clase(txt_path):
+    numar = {}
+    if txt_path is None:
+        return numar
+    with open(txt_path) as f:
+        for linie in f:
+            parti = linie.split()
+            if not parti:
+                continue
+            try:
+                clasa = int(parti[0])
+            except ValueError:
+                continue
+            numar[clasa] = numar.get(clasa, 0) + 1
+    return numar
+
+
+# Indexul claselor: pentru fiecare imagine, numarul de box-uri pe clasa; adnotarile sunt citite o singura data, pe fire
+def indexeaza_clase(perechi, workers=8):
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(numara_clase, [txt_path for _, txt_path in perechi]))
+
+
+# Impartire stratificata: fiecare clasa (dupa numarul de imagini in care apare) si imaginile background ajung
+# in train in proportie cat mai apropiata de train_percent. Imaginile cu clasele cele mai rare sunt repartizate
+# primele, fiecare in setul caruia ii lipseste cea mai mare parte din necesarul sau pentru clasele imaginii si total.
+def imparte_stratificat(perechi, index_clase, train_percent, seed):
+    fractii = {'train': train_percent, 'validation': 1 - train_percent}
+    chei = [list(numar) or ['background'] for numar in index_clase]
+    totaluri = Counter(cheie for chei_img in chei for cheie in chei_img)
+    totaluri['total'] = len(perechi)
+    # ramas[set][cheie]: cate imagini cu aceasta cheie ii mai trebuie setului pentru a atinge proportia dorita
+    ramas = {s: {cheie: f * n for cheie, n in totaluri.items()} for s, f in fractii.items()}
+
+    # Ordinea: amestecare cu samanta, apoi sortare stabila dupa raritatea celei mai rare clase din imagine
+    ordine = list(range(len(perechi)))
+    random.Random(seed).shuffle(ordine)
+    ordine.sort(key=lambda i: min(totaluri[cheie] for cheie in chei[i]))
+
+    seturi = {s: [] for s in fractii}
+    for i in ordine:
+        chei_img = chei[i] + ['total']
+        s_ales = max(fractii, key=lambda s: (sum(ramas[s][cheie] / (fractii[s] * totaluri[cheie]) for cheie in chei_img),
+                                             ramas[s]['total']))
+        for cheie in chei_img:
+            ramas[s_ales][cheie] -= 1
+        seturi[s_ales].append(perechi[i])
+    return seturi
+
+
+# Afiseaza pentru fiecare clasa (si pentru background) cate imagini au ajuns in train si ce fractie reprezinta
+def afiseaza_distributie(seturi, index_per_imagine):
+    numar = {s: Counter() for s in seturi}
+    for s, perechi_set in seturi.items():
+        for img_path, _ in perechi_set:
+            numar[s].update(list(index_per_imagine[img_path]) or ['background'])
+    chei = sorted(set(numar['train']) | set(numar['validation']), key=str)
+    for cheie in chei:
+        tr, val = numar['train'][cheie], numar['validation'][cheie]
+        print(f'  clasa {cheie}: train {tr}, validation {val} ({tr / (tr + val):.1%} in train)')
+
+
+# Copiaza, leaga sau muta un fisier; destinatia existenta (de la o impartire anterioara) este inlocuita
+def transfera(sursa, destinatie, mod):
+    if os.path.lexists(destinatie):
+        os.remove(destinatie)
+    if mod == 'copy':
+        shutil.copyfile(sursa, destinatie)
+    elif mod == 'hardlink':
+        os.link(sursa, destinatie)
+    elif mod == 'symlink':
+        os.symlink(os.path.abspath(sursa), destinatie)
+    else:
+        shutil.move(sursa, destinatie)
+
+
+def main():
+    # Defineste si parseaza argumentele introduse de utilizator
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--datapath', help='Cale catre folderul cu date care contine fisierele de imagini si adnotari',
+                        required=True)
+    parser.add_argument('--train_pct', help='Procentul de imagini care merg in folderul train; \
+                        restul merg in folderul de validare (exemplu: ".8")',
+                        default=.8)
+    parser.add_argument('--seed', help='Samanta amestecarii; aceeasi samanta da aceeasi impartire (implicit 0)',
+                        default=0)
+    parser.add_argument('--mode', help='Cum ajung fisierele in train/validation: copy, hardlink, symlink sau move \
+                        (hardlink si symlink nu ocupa spatiu in plus; move goleste datasetul initial)',
+                        choices=MODURI, default='copy')
+    parser.add_argument('--stratify', help='Imparte separat fiecare clasa si imaginile background, ca fiecare set sa le aiba \
+                        in proportia --train_pct', action='store_true')
+    parser.add_argument('--workers', help='Numarul de fire pentru operatiile pe fisiere (implicit 8)', default=8)
+    parser.add_argument('--output', help='Folderul in care sunt create train si validation (implicit ./data)',
+                        default=os.path.join(os.getcwd(), 'data'))
+    parser.add_argument('--manifest', help='Fisierul CSV cu destinatia fiecarei imagini (implicit <output>/split_manifest.csv)',
+                        default=None)
+
+    args = parser.parse_args()
+
+    data_path = args.datapath
+    train_percent = float(args.train_pct)
+
+    # Verifica daca datele introduse sunt valide
+    if not os.path.isdir(data_path):
+        print('Directorul specificat la --datapath nu a fost gasit. Verifica daca calea este corecta si incearca din nou.')
+        sys.exit(0)
+    if train_percent < .01 or train_percent > 0.99:
+        print('Valoare invalida pentru train_pct. Introdu un numar intre .01 si .99.')
+        sys.exit(0)
+
+    # Defineste calea catre datasetul initial
+    input_image_path = os.path.join(data_path,'images')
+    input_label_path = os.path.join(data_path,'labels')
+
+    # Obtine lista tuturor imaginilor si adnotarea fiecareia
+    t_start = time.perf_counter()
+    perechi = asociaza_adnotari(cauta_imagini(input_image_path), input_label_path)
+    print(f'Numar de fisiere imagine: {len(perechi)}')
+    print(f'Numar de fisiere adnotare: {sum(1 for _, txt_path in perechi if txt_path is not None)}')
+
+    if args.stratify:
+        index_clase = indexeaza_clase(perechi, int(args.workers))
+        seturi = imparte_stratificat(perechi, index_clase, train_percent, int(args.seed))
+    else:
+        seturi = imparte_aleator(perechi, train_percent, int(args.seed))
+    print('Imagini mutate in train: %d' % len(seturi['train']))
+    print('Imagini mutate in validation: %d' % len(seturi['validation']))
+    if args.stratify:
+        afiseaza_distributie(seturi, {img_path: numar for (img_path, _), numar in zip(perechi, index_clase)})
+
+    # Creeaza folderele daca nu exista deja
+    for set_nume in seturi:
+        for sub in ['images', 'labels']:
+            dir_path = os.path.join(args.output, set_nume, sub)
+            if not os.path.exists(dir_path):
+                os.makedirs(dir_path)
+                print(f'Folder creat la {dir_path}.')
+            elif os.listdir(dir_path):
+                print(f'Atentie: {dir_path} nu este gol; fisierele ramase de la o impartire anterioara nu sunt sterse.')
+
+    # Lista operatiilor: fiecare imagine si, daca exista, adnotarea ei
+    operatii = []
+    manifest_randuri = []
+    for set_nume, perechi_set in seturi.items():
+        for img_path, txt_path in perechi_set:
+            new_img_path = os.path.join(args.output, set_nume, 'images', os.path.basename(img_path))
+            operatii.append((img_path, new_img_path))
+            new_txt_path = ''
+            if txt_path is not None: # Daca fisierul txt nu exista, inseamna ca e imagine background
+                new_txt_path = os.path.join(args.output, set_nume, 'labels', os.path.basename(txt_path))
+                operatii.append((txt_path, new_txt_path))
+            manifest_randuri.append([set_nume, img_path, new_img_path, txt_path or '', new_txt_path])
+
+    # Operatiile pe fisiere sunt limitate de disc, nu de procesor, deci ruleaza pe fire
+    with ThreadPoolExecutor(max_workers=int(args.workers)) as executor:
+        viitoare = [executor.submit(transfera, sursa, destinatie, args.mode) for sursa, destinatie in operatii]
+        erori = [(sursa, v.exception()) for (sursa, _), v in zip(operatii, viitoare) if v.exception() is not None]
+    for sursa, eroare in erori[:10]:
+        print(f'EROARE la {sursa}: {eroare}')
+    if erori:
+        print(f'{len(erori)} fisiere nu au putut fi transferate.')
+
+    # classes.txt ajunge langa seturi, ca dataset_index.py --datapath <output> sa verifice clasele fara alte argumente
+    cale_clase = os.path.join(data_path, 'classes.txt')
+    if os.path.exists(cale_clase):
+        shutil.copyfile(cale_clase, os.path.join(args.output, 'classes.txt'))
+    else:
+        print(f'Atentie: {cale_clase} nu exista; dataset_index.py va avea nevoie de --classes.')
+
+    manifest = args.manifest or os.path.join(args.output, 'split_manifest.csv')
+    with open(manifest, 'w', newline='') as f:
+        scriitor = csv.writer(f)
+        scriitor.writerow(['set', 'imagine', 'imagine_noua', 'adnotare', 'adnotare_noua'])
+        scriitor.writerows(manifest_randuri)
+    print(f'{len(operatii)} fisiere ({args.mode}) in {time.perf_counter() - t_start:.1f} s. Manifestul a fost salvat la {manifest}')
+
+
+if __name__ == '__main__':
+    main()
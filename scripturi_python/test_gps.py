@@ -1,14 +1,23 @@
-import serial             # Biblioteca pentru comunicare pe port serial
-import pynmea2            # Biblioteca pentru parsarea mesajelor GPS in format NMEA
+import argparse           # Pentru alegerea portului din linia de comanda
+from nmea import parseaza  # Parsare NMEA din bytes (GGA/RMC de la orice emitator, cu suma de control)
+from serial_replay import deschide_port  # Port real, GPS simulat sau captura redata
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--port', help='Portul GPS: cale, replay:captura.jsonl[@viteza], sim:gps sau sim:gps_fara_fix', default='/dev/ttyAMA3')
+parser.add_argument('--serial_log', help='Salveaza octetii primiti de la GPS in acest fisier (JSON pe linie)', default=None)
+args = parser.parse_args()
 
 # Deschide portul serial la adresa specificata, viteza 9600 bps, timeout 1 secunda
-ser = serial.Serial('/dev/ttyAMA3', 9600, timeout=1)
+ser = deschide_port(args.port, 9600, timeout=1, inregistrare=args.serial_log)
 
 while True:   # Bucla infinita pentru citirea continua a datelor de la GPS
-    line = ser.readline().decode(errors='ignore').strip()   # Citeste o linie de la portul serial si decodeaza
-    if line.startswith('$GPGGA') or line.startswith('$GPRMC'):  # Daca linia contine date de localizare
-        try:
-            msg = pynmea2.parse(line)   # Parseeaza linia NMEA cu pynmea2
-            print(f"Latitudine: {msg.latitude}, Longitudine: {msg.longitude}")  # Afiseaza coordonatele
-        except pynmea2.ParseError:
-            continue  # Daca mesajul nu poate fi parsat, trece mai departe
+    line = ser.readline()      # Citeste o linie de la portul serial (bytes)
+    msg = parseaza(line)       # None pentru alte mesaje sau pentru linii corupte (suma de control gresita)
+    if msg is None:
+        continue
+    if msg.tip == 'GGA':       # GGA contine si calitatea fix-ului, numarul de sateliti si HDOP
+        print(f"[{msg.emitator}GGA {msg.utc}] Fix: {msg.calitate}, sateliti: {msg.sateliti}, HDOP: {msg.hdop}")
+    if msg.valid:              # Afiseaza coordonatele doar pentru un fix valid
+        print(f"Latitudine: {msg.lat}, Longitudine: {msg.lon}")  # Afiseaza coordonatele
+    else:
+        print(f"Fara fix valid ({msg.emitator}{msg.tip})")
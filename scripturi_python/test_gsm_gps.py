@@ -1,48 +1,52 @@
-import serial             # Biblioteca pentru comunicare seriala cu GPS si GSM
-import pynmea2            # Biblioteca pentru parsarea mesajelor NMEA de la GPS
+import argparse           # Pentru alegerea porturilor din linia de comanda
+from nmea import parseaza  # Parsare NMEA din bytes, cu suma de control si calitatea fix-ului
 import time               # Biblioteca pentru delay-uri (asteptare)
+from serial_replay import deschide_port  # Porturi reale, simulate sau capturi redate
+from sms_dispatcher import SmsDispatcher, citeste_destinatari  # Trimite SMS-urile in fundal, citind raspunsurile modulului
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--gps_port', help='Portul GPS: cale, replay:captura.jsonl[@viteza], sim:gps sau sim:gps_fara_fix', default='/dev/ttyAMA3')
+parser.add_argument('--gsm_port', help='Portul GSM: cale, replay:captura.jsonl[@viteza], sim:modem sau sim:modem_eroare', default='/dev/ttyAMA0')
+parser.add_argument('--serial_log', help='Salveaza traficul serial in <prefix>_gps.jsonl si <prefix>_gsm.jsonl', default=None)
+args = parser.parse_args()
 
 # Portul serial pentru GPS (modifica daca nu este acesta)
-gps_ser = serial.Serial('/dev/ttyAMA3', 9600, timeout=1)
+gps_ser = deschide_port(args.gps_port, 9600, timeout=1,
+                        inregistrare=f'{args.serial_log}_gps.jsonl' if args.serial_log else None)
 
 # Portul serial pentru GSM (modifica daca nu este acesta)
-gsm_ser = serial.Serial('/dev/ttyAMA0', 9600, timeout=2)
+gsm_ser = deschide_port(args.gsm_port, 9600, timeout=2,
+                        inregistrare=f'{args.serial_log}_gsm.jsonl' if args.serial_log else None)
 
 # Numarul de telefon la care va fi trimis SMS-ul (modifica dupa nevoie)
 numar_telefon = "+40732607209"  # Inlocuieste cu numarul tau
 
+# Daca exista destinatari.json, SMS-ul este trimis tuturor numerelor din fisier
+destinatari = citeste_destinatari('destinatari.json') or [numar_telefon]
+
+# Dispecerul detine portul GSM: trimite AT, AT+CMGF=1, AT+CMGS si textul, asteptand raspunsul modulului
+dispecer_sms = SmsDispatcher(gsm_ser, numar_telefon)
+dispecer_sms.start()
+
 def trimite_sms(text):
-    # Trimite un SMS cu textul primit ca argument
-    gsm_ser.write(b'AT\r')                           # Test comunicare cu modulul GSM
-    time.sleep(1)
-    gsm_ser.write(b'AT+CMGF=1\r')                    # Pune modulul in modul Text
-    time.sleep(1)
-    gsm_ser.write(f'AT+CMGS="{numar_telefon}"\r'.encode())  # Seteaza destinatarul
-    time.sleep(1)
-    gsm_ser.write(text.encode() + b"\x1A")           # Trimite textul si Ctrl+Z pentru terminare SMS
-    print("SMS trimis:", text)
-    time.sleep(3)                                    # Asteapta pentru procesare
+    # Pune SMS-ul in coada dispecerului pentru toti destinatarii; rezultatul fiecarei trimiteri este afisat de dispecer
+    if not dispecer_sms.trimite_tuturor(text, destinatari):
+        print("Coada de SMS-uri este plina, mesaj ignorat:", text)
 
 ultimele_coord = None    # Retine ultimele coordonate pentru a evita trimiterea de SMS-uri duplicate
 
 while True:
-    line = gps_ser.readline().decode(errors='ignore').strip()   # Citeste o linie de la GPS si decodeaza
-    if line.startswith('$GPGGA') or line.startswith('$GPRMC'):  # Daca este linie cu informatii de pozitie
-        try:
-            msg = pynmea2.parse(line)             # Parseeaza mesajul NMEA
-            lat = msg.latitude                    # Extrage latitudinea
-            lon = msg.longitude                   # Extrage longitudinea
-            # Daca lat si lon sunt valide (nu sunt 0)
-            if lat != 0.0 and lon != 0.0:
-                coord = f"{lat:.6f},{lon:.6f}"    # Formateaza coordonatele ca text
-                print(f"Coordonate curente: {coord}")
-                # Trimite SMS doar daca s-au schimbat coordonatele fata de ultima transmisa
-                if coord != ultimele_coord:
-                    mesaj = f"Locatia curenta este: {coord}"
-                    trimite_sms(mesaj)            # Trimite SMS cu locatia noua
-                    ultimele_coord = coord
-                    # Daca vrei sa trimiti un singur SMS, poti decomenta break-ul de mai jos
-                    # break
-                time.sleep(10)  # Asteapta 10 secunde inainte de urmatorul SMS
-        except pynmea2.ParseError:
-            continue           # Daca nu poate parsa linia, trece peste
+    line = gps_ser.readline()                     # Citeste o linie de la GPS (bytes)
+    msg = parseaza(line)                          # GGA/RMC de la orice emitator; None daca linia e corupta
+    # Foloseste doar fix-urile valide (GGA cu calitate > 0, RMC cu status 'A') cu coordonate nenule
+    if msg is not None and msg.valid and msg.lat != 0.0 and msg.lon != 0.0:
+        coord = f"{msg.lat:.6f},{msg.lon:.6f}"    # Formateaza coordonatele ca text
+        print(f"Coordonate curente: {coord}")
+        # Trimite SMS doar daca s-au schimbat coordonatele fata de ultima transmisa
+        if coord != ultimele_coord:
+            mesaj = f"Locatia curenta este: {coord}"
+            trimite_sms(mesaj)            # Trimite SMS cu locatia noua
+            ultimele_coord = coord
+            # Daca vrei sa trimiti un singur SMS, poti decomenta break-ul de mai jos
+            # break
+        time.sleep(10)  # Asteapta 10 secunde inainte de urmatorul SMS
@@ -1,32 +1,41 @@
-import serial            # Biblioteca pentru comunicare pe port serial
-import time              # Biblioteca pentru operatii de temporizare (delay)
+import argparse          # Pentru alegerea portului din linia de comanda
+import time              # Biblioteca pentru masurarea duratei trimiterii
+
+from at_modem import ModemAT, ErroareAT   # Comenzi AT care asteapta raspunsul modulului, nu pauze fixe
+from serial_replay import deschide_port   # Port real, modul simulat sau captura redata
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--port', help='Portul GSM: cale, replay:captura.jsonl[@viteza], sim:modem sau sim:modem_eroare', default='/dev/ttyAMA0')
+parser.add_argument('--serial_log', help='Salveaza traficul cu modulul in acest fisier (JSON pe linie)', default=None)
+args = parser.parse_args()
 
 # Deschide portul serial la adresa specificata, cu baudrate 9600 si timeout 2 secunde
-ser = serial.Serial('/dev/ttyAMA0', baudrate=9600, timeout=2)
-
-def send_at(command, delay=1):
-    # Trimite o comanda AT si returneaza raspunsul de la modulul GSM
-    ser.write((command + '\r').encode())              # Trimite comanda AT cu sfarsit de linie
-    time.sleep(delay)                                 # Asteapta un timp scurt pentru ca modulul sa raspunda
-    response = ser.read_all().decode(errors='ignore') # Citeste toate datele din buffer si decodeaza
-    print(f">>> {command}\n{response}")               # Afiseaza comanda si raspunsul in consola
+ser = deschide_port(args.port, baudrate=9600, timeout=2, inregistrare=args.serial_log)
+modem = ModemAT(ser, la_urc=lambda ev: print(f"<<< URC {ev.tip}: {ev.date}"))
+
+def send_at(command, timeout=2):
+    # Trimite o comanda AT si returneaza raspunsul imediat ce modulul trimite codul final
+    try:
+        response = modem.comanda(command, timeout)
+    except ErroareAT as e:
+        print(f">>> {command}\n{e}")
+        return None
+    print(f">>> {command}\n" + "\n".join(l.decode(errors='ignore') for l in response.linii) + f"\n{response.final.decode()}")
     return response
 
 # Test comunicare - verifica daca modulul GSM raspunde la comanda AT
-send_at('AT', 1)
-
-# Pune modulul GSM in modul Text pentru SMS (nu PDU)
-send_at('AT+CMGF=1', 1)
-
-# Trimite comanda pentru a pregati trimiterea SMS-ului catre numarul specificat
-send_at('AT+CMGS="+40768671235"', 2)
-
-# Trimite textul SMS-ului urmat de CTRL+Z (hex 1A) pentru a marca sfarsitul mesajului
-ser.write(b'coordonate: 44.4331071 26.0584579\x1A')
-time.sleep(5)  # Asteapta cateva secunde pentru ca SMS-ul sa fie transmis
-
-# Citeste si afiseaza raspunsul de confirmare dupa trimiterea SMS-ului
-print(ser.read_all().decode(errors='ignore'))
+send_at('AT')
+
+# Initializeaza sesiunea o singura data: AT, ecou oprit si modul Text pentru SMS (nu PDU)
+modem.initializeaza()
+
+# Trimite SMS-ul: asteapta promptul '>', trimite textul urmat de CTRL+Z (hex 1A) si asteapta '+CMGS'
+t_start = time.perf_counter()
+try:
+    referinta = modem.trimite_sms('+40768671235', 'coordonate: 44.4331071 26.0584579')
+    print(f"SMS trimis (referinta {referinta}) in {time.perf_counter() - t_start:.2f} s")
+except ErroareAT as e:
+    print(f"SMS netrimis: {e}")
 
 # Inchide portul serial pentru a elibera resursa hardware
 ser.close()
@@ -0,0 +1,75 @@
+# Inferenta pe bucati (tile-uri) pentru imaginile de rezolutie mare
+# Imaginea la rezolutia originala este impartita in tile-uri suprapuse de marime x marime pixeli, toate
+# tile-urile sunt trimise modelului intr-un singur lot, iar box-urile sunt mutate inapoi in coordonatele
+# imaginii intregi. Detectiile duplicate din zonele de suprapunere sunt unite cu NMS pe fiecare clasa.
+# Astfel un urs indepartat dintr-o imagine 4K nu mai este micsorat la cativa pixeli inainte de detectie.
+
+import cv2               # Pentru NMS (cv2.dnn.NMSBoxes)
+import numpy as np       # Pentru coordonatele box-urilor
+
+from postprocesare import extrage_detectii, detectii_goale
+
+
+# Pozitiile de inceput ale tile-urilor pe o axa, ca ultimul tile sa se termine exact la margine
+def _pozitii(lungime, marime, pas):
+    if lungime <= marime:
+        return [0]
+    pozitii = list(range(0, lungime - marime, pas))
+    return pozitii + [lungime - marime]
+
+
+# Intoarce lista (x0, y0, x1, y1) a tile-urilor pentru o imagine latime x inaltime
+def grila_tile(latime, inaltime, marime=640, suprapunere=0.2):
+    pas = max(1, int(marime * (1 - suprapunere)))
+    return [(x, y, min(x + marime, latime), min(y + marime, inaltime))
+            for y in _pozitii(inaltime, marime, pas) for x in _pozitii(latime, marime, pas)]
+
+
+# NMS pe fiecare clasa; intoarce indicii detectiilor pastrate
+def nms_pe_clasa(boxes_xyxy, boxes_conf, boxes_cls, prag_iou=0.5):
+    if len(boxes_conf) == 0:
+        return np.zeros(0, dtype=int)
+    # Box-urile fiecarei clase sunt deplasate intr-o zona separata, deci un singur NMS nu amesteca clasele
+    deplasare = (boxes_cls[:, None] * (boxes_xyxy.max() + 1)).astype(np.float32)
+    boxes = boxes_xyxy.astype(np.float32) + deplasare
+    xywh = np.concatenate([boxes[:, :2], boxes[:, 2:] - boxes[:, :2]], axis=1)
+    pastrate = cv2.dnn.NMSBoxes(xywh.tolist(), boxes_conf.astype(float).tolist(), 0.0, prag_iou)
+    return np.array(pastrate, dtype=int).reshape(-1)
+
+
+# Ruleaza modelul pe tile-urile imaginii si intoarce (xyxy int Nx4, conf N, cls int N) in coordonatele imaginii
+# lot: cate tile-uri intr-un apel al modelului (None = toate); imagine_intreaga: adauga si imaginea intreaga,
+# pentru ursii apropiati care sunt mai mari decat un tile
+def detecteaza_pe_tile(model, frame, min_thresh, marime=640, suprapunere=0.2, prag_nms=0.5,
+                       imagine_intreaga=True, lot=None):
+    inaltime, latime = frame.shape[:2]
+    grila = grila_tile(latime, inaltime, marime, suprapunere)
+    imagini = [frame[y0:y1, x0:x1] for x0, y0, x1, y1 in grila]
+    deplasari = [(x0, y0) for x0, y0, _, _ in grila]
+    if imagine_intreaga and len(grila) > 1:
+        imagini.append(frame)
+        deplasari.append((0, 0))
+
+    lot = lot or len(imagini)
+    rezultate = []
+    for i in range(0, len(imagini), lot):
+        rezultate += model(imagini[i:i + lot], verbose=False)
+
+    xyxy, conf, cls = [], [], []
+    for rezultat, (x0, y0) in zip(rezultate, deplasari):
+        b_xyxy, b_conf, b_cls = extrage_detectii(rezultat.boxes, min_thresh)
+        xyxy.append(b_xyxy + np.array([x0, y0, x0, y0]))
+        conf.append(b_conf)
+        cls.append(b_cls)
+    if not xyxy:
+        return detectii_goale()
+    xyxy, conf, cls = np.concatenate(xyxy), np.concatenate(conf), np.concatenate(cls)
+    pastrate = nms_pe_clasa(xyxy, conf, cls, prag_nms)
+    return xyxy[pastrate], conf[pastrate], cls[pastrate]
+
+
+# Scaleaza box-urile detectate pe imaginea originala la rezolutia frame-ului afisat
+def scaleaza_boxes(boxes_xyxy, forma_originala, forma_noua):
+    sy = forma_noua[0] / forma_originala[0]
+    sx = forma_noua[1] / forma_originala[1]
+    return (boxes_xyxy * np.array([sx, sy, sx, sy])).astype(int)
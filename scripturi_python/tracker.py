@@ -0,0 +1,83 @@
+# Urmarirea ursilor intre frame-uri si confirmarea detectiilor inainte de alerta
+# Box-urile din fiecare frame sunt asociate cu track-urile existente dupa IoU (sau dupa distanta dintre
+# centre, daca ursul s-a deplasat mult intre doua detectii). Un track este confirmat cand a fost vazut in
+# cel putin K din ultimele M detectii, iar alerta pentru el se trimite o singura data cat timp traieste.
+
+from collections import deque
+
+import numpy as np       # Pentru calculul vectorizat al IoU intre track-uri si detectii
+
+
+class Track:
+    def __init__(self, id_track, box, m):
+        self.id = id_track
+        self.box = box
+        self.istoric = deque([True], maxlen=m)   # A fost vazut sau nu in ultimele M detectii
+        self.lipsa = 0                           # Cate detectii consecutive fara potrivire
+        self.alertat = False
+
+
+# IoU intre fiecare box din a (Nx4) si fiecare box din b (Mx4), rezultat NxM
+def iou_matrice(a, b):
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    intersectie = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    arie_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    arie_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return intersectie / np.maximum(arie_a[:, None] + arie_b[None, :] - intersectie, 1e-6)
+
+
+class BearTracker:
+    # prag_iou: IoU minim pentru asociere; k, m: confirmare in K din ultimele M detectii
+    # max_lipsa: dupa cate detectii fara potrivire track-ul este sters
+    def __init__(self, prag_iou=0.3, k=3, m=5, max_lipsa=10):
+        self.prag_iou = prag_iou
+        self.k = k
+        self.m = m
+        self.max_lipsa = max_lipsa
+        self.trackuri = []
+        self._urmatorul_id = 1
+
+    # Actualizeaza track-urile cu box-urile (Nx4) ale unei detectii noi si intoarce
+    # track-urile confirmate pentru care nu s-a trimis inca alerta
+    def actualizeaza(self, boxes_xyxy):
+        boxes = np.asarray(boxes_xyxy, dtype=np.float32).reshape(-1, 4)
+        potrivite, folosite = set(), set()
+        if self.trackuri and len(boxes):
+            vechi = np.array([t.box for t in self.trackuri], dtype=np.float32)
+            iou = iou_matrice(vechi, boxes)
+            # Fallback pe distanta dintre centre: detectia este la mai putin de o diagonala de box distanta.
+            # Primeste un scor sub prag_iou, ca perechile cu IoU bun sa fie asociate primele.
+            centre_vechi = (vechi[:, :2] + vechi[:, 2:]) / 2
+            centre_noi = (boxes[:, :2] + boxes[:, 2:]) / 2
+            distanta = np.linalg.norm(centre_vechi[:, None] - centre_noi[None, :], axis=2)
+            diagonala = np.maximum(np.linalg.norm(vechi[:, 2:] - vechi[:, :2], axis=1)[:, None], 1e-6)
+            scor_centre = np.clip(1 - distanta / diagonala, 0, None) * self.prag_iou * 0.5
+            scor = np.where(iou >= self.prag_iou, iou, scor_centre)
+            # Asociere greedy: cea mai buna pereche ramasa, pana nu mai exista perechi posibile
+            while scor.max() > 0:
+                i, j = np.unravel_index(np.argmax(scor), scor.shape)
+                track = self.trackuri[i]
+                track.box = boxes[j]
+                track.istoric.append(True)
+                track.lipsa = 0
+                potrivite.add(i)
+                folosite.add(j)
+                scor[i, :] = 0
+                scor[:, j] = 0
+        for i, track in enumerate(self.trackuri):
+            if i not in potrivite:
+                track.istoric.append(False)
+                track.lipsa += 1
+        self.trackuri = [t for t in self.trackuri if t.lipsa <= self.max_lipsa]
+        for j, box in enumerate(boxes):
+            if j not in folosite:
+                self.trackuri.append(Track(self._urmatorul_id, box, self.m))
+                self._urmatorul_id += 1
+        return [t for t in self.trackuri if not t.alertat and sum(t.istoric) >= self.k]
+
+    # Apelat dupa ce alerta pentru track a fost trimisa; track-ul nu mai genereaza alerte
+    def marcheaza_alertat(self, track):
+        track.alertat = True
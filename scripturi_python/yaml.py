@@ -2,11 +2,14 @@
 # 1. Citeste fisierul "classes.txt" ca sa obtina lista de clase
 # 2. Creeaza un dictionar cu caile catre foldere, numarul de clase si denumirile claselor
 # 3. Scrie aceste date in format YAML in fisierul data.yaml
+# Daca exista indexul creat de dataset_index.py, calea datasetului si seturile sunt luate din index; clasele vin
+# mereu din classes.txt, iar indexul este verificat sa fi fost creat cu aceleasi clase
 
 import yaml           # Importa biblioteca pentru lucru cu fisiere YAML
 import os             # Pentru operatii cu sistemul de fisiere
+import json           # Pentru citirea indexului datasetului
 
-def create_data_yaml(path_to_classes_txt, path_to_data_yaml):
+def create_data_yaml(path_to_classes_txt, path_to_data_yaml, path_to_index=None):
 
   # Citeste classes.txt pentru a obtine numele claselor
   if not os.path.exists(path_to_classes_txt):
@@ -28,18 +31,39 @@ def create_data_yaml(path_to_classes_txt, path_to_data_yaml):
       'names': classes                     # Lista cu numele claselor
   }
 
+  # Daca datasetul a fost indexat cu dataset_index.py, calea si seturile sunt luate din index, fara recitirea fisierelor
+  sursa = ''
+  if path_to_index is not None and not os.path.exists(path_to_index):
+    print(f'Indexul {path_to_index} nu a fost gasit; datasetul nu a fost verificat cu dataset_index.py.')
+  elif path_to_index is not None:
+    with open(path_to_index, 'r') as f:
+      index = json.load(f)
+    if index.get('clase') != classes:
+      print(f'EROARE: indexul {path_to_index} a fost creat cu alte clase decat {path_to_classes_txt} '
+            f'(nc {index.get("nc")} in loc de {number_of_classes}); ruleaza din nou dataset_index.py cu acest classes.txt.')
+      return
+    if index.get('probleme'):
+      print(f'Atentie: indexul contine {index["probleme"]} probleme; ruleaza dataset_index.py si corecteaza datasetul inainte de antrenare.')
+    seturi = index['seturi']
+    data['path'] = index['radacina']
+    data['train'] = 'train/images' if 'train' in seturi else 'images'
+    data['val'] = 'validation/images' if 'validation' in seturi else 'images'
+    sursa = f' (seturile din indexul {path_to_index})'
+
   # Scrie dictionarul de date in fisierul YAML
   with open(path_to_data_yaml, 'w') as f:
     yaml.dump(data, f, sort_keys=False)
-  print(f'Fisierul de configurare a fost creat la {path_to_data_yaml}')
+  print(f'Fisierul de configurare a fost creat la {path_to_data_yaml}{sursa}')
 
   return
 
 # Defineste calea catre classes.txt si ruleaza functia
 path_to_classes_txt = '/content/custom_data/classes.txt'
 path_to_data_yaml = '/content/data.yaml'
+# Creat de dataset_index.py --datapath /content/data, cu classes.txt copiat acolo de split_images.py din /content/custom_data
+path_to_index = '/content/data/dataset_index.json'
 
-create_data_yaml(path_to_classes_txt, path_to_data_yaml)
+create_data_yaml(path_to_classes_txt, path_to_data_yaml, path_to_index)
 
 print('\nContinutul fisierului:\n')
 # Afiseaza continutul fisierului data.yaml (linie specifica pentru Google Colab)
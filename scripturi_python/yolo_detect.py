@@ -3,10 +3,16 @@ import sys                # Pentru terminarea programului in caz de eroare
 import argparse           # Pentru a prelua argumente din linia de comanda
 import glob               # Pentru a gasi fisiere dupa pattern
 import time               # Pentru masurarea timpului de procesare
+from collections import deque  # Coada pentru rezultatele unui batch
 
 import cv2                # Biblioteca OpenCV pentru procesarea imaginilor
 import numpy as np        # Pentru calcule numerice si procesarea de array-uri
-from ultralytics import YOLO  # Importa modelul YOLO pentru detectie
+
+from backend import incarca_model, BACKENDURI_CU_LOT  # Incarca modelul pe cel mai rapid backend disponibil
+from frame_capture import FrameCapture, citire_videocapture  # Captura frame-urilor pe fir separat
+from postprocesare import extrage_detectii  # Filtrare vectorizata a detectiilor
+from tiling import detecteaza_pe_tile, scaleaza_boxes  # Detectie pe tile-uri pentru imagini mari
+from prefetch import ImagePrefetcher  # Decodarea imaginilor din folder in avans
 
 # Defineste si parseaza argumentele introduse de utilizator
 
@@ -25,23 +31,41 @@ parser.add_argument('--resolution', help='Rezolutia WxH la care sa se afiseze re
 parser.add_argument('--record', help='Inregistreaza rezultatele din video sau camera si le salveaza ca "demo1.avi". \
                     Trebuie sa specifici si argumentul --resolution.',
                     action='store_true')
+parser.add_argument('--batch', help='Numarul de frame-uri procesate impreuna de model, doar pentru surse folder sau video \
+                    (exemplu: "8"). Implicit 1, adica frame cu frame.',
+                    default=1)
+parser.add_argument('--backend', help='Backend-ul de inferenta: auto (cel mai rapid dintre variantele exportate cu export_model.py), \
+                    pytorch, onnx, onnx_int8, openvino, openvino_int8 sau ncnn',
+                    default='auto')
+parser.add_argument('--tile', help='Marimea tile-urilor in pixeli (exemplu: "640"), doar pentru surse imagine sau folder. \
+                    Imaginea la rezolutia originala este impartita in tile-uri suprapuse, detectate intr-un singur lot.',
+                    default=None)
+parser.add_argument('--tile_overlap', help='Suprapunerea dintre tile-uri vecine, intre 0 si 1 (exemplu: "0.2")',
+                    default=0.2)
+parser.add_argument('--prefetch', help='Doar pentru surse folder: cate imagini sunt decodate in avans pe fire separate \
+                    (exemplu: "4"; 0 dezactiveaza decodarea in avans)',
+                    default=4)
 
 args = parser.parse_args()
 
 # Preia argumentele introduse de utilizator
 model_path = args.model
 img_source = args.source
-min_thresh = args.thresh
+min_thresh = float(args.thresh)
 user_res = args.resolution
 record = args.record
+batch_size = int(args.batch)
 
 # Verifica daca fisierul modelului exista si este valid
 if (not os.path.exists(model_path)):
     print('EROARE: Calea catre model este invalida sau modelul nu a fost gasit. Verifica numele fisierului modelului.')
     sys.exit(0)
 
-# Incarca modelul YOLO in memorie si preia labelmap-ul (numele claselor)
-model = YOLO(model_path, task='detect')
+# Incarca modelul YOLO in memorie (pe backend-ul ales) si preia labelmap-ul (numele claselor)
+backend, model = incarca_model(model_path, args.backend)
+if model is None:
+    print(f'Backend-ul {args.backend} nu a fost exportat pentru acest model sau runtime-ul nu este instalat. Ruleaza export_model.py.')
+    sys.exit(0)
 labels = model.names
 
 # Identifica tipul sursei: imagine, folder, video, camera USB, picamera
@@ -69,6 +93,27 @@ else:
     print(f'Inputul {img_source} este invalid. Incearca din nou.')
     sys.exit(0)
 
+# Modul batch are sens doar pentru surse offline, unde frame-urile pot fi decodate in avans
+if batch_size < 1:
+    print('Valoare invalida pentru --batch. Introdu un numar intreg mai mare sau egal cu 1.')
+    sys.exit(0)
+if batch_size > 1 and source_type not in ['folder', 'video']:
+    print('Modul --batch functioneaza doar pentru surse de tip folder sau video. Incearca din nou.')
+    sys.exit(0)
+# Exporturile ONNX si NCNN au lotul fix 1: frame-urile sunt decodate tot in avans, dar trimise modelului cate unul
+lot_model = batch_size if backend in BACKENDURI_CU_LOT else 1
+if batch_size > 1 and lot_model == 1:
+    print(f'Backend-ul {backend} nu accepta loturi; frame-urile din --batch vor fi trimise modelului cate unul.')
+
+# Inferenta pe tile-uri: tile-urile unei imagini formeaza deja un lot, deci nu se combina cu --batch
+tile = None
+if args.tile is not None:
+    if source_type not in ['image', 'folder'] or batch_size > 1:
+        print('Modul --tile functioneaza doar pentru surse de tip imagine sau folder, fara --batch. Incearca din nou.')
+        sys.exit(0)
+    tile = int(args.tile)
+    lot_tile = None if backend in BACKENDURI_CU_LOT else 1
+
 # Preia rezolutia specificata de utilizator, daca exista
 resize = False
 if user_res:
@@ -90,6 +135,7 @@ if record:
     recorder = cv2.VideoWriter(record_name, cv2.VideoWriter_fourcc(*'MJPG'), record_fps, (resW,resH))
 
 # Incarca sau initializeaza sursa de imagini
+preincarcare = None
 if source_type == 'image':
     imgs_list = [img_source]
 elif source_type == 'folder':
@@ -99,6 +145,10 @@ elif source_type == 'folder':
         _, file_ext = os.path.splitext(file)
         if file_ext in img_ext_list:
             imgs_list.append(file)
+    # Imaginile urmatoare sunt decodate in paralel cu inferenta; cu --resolution, JPEG-urile mari sunt decodate direct micsorate
+    if int(args.prefetch) > 0:
+        preincarcare = ImagePrefetcher(imgs_list, marime=max(int(args.prefetch), batch_size),
+                                       rezolutie=(resW, resH) if resize and tile is None else None)
 elif source_type == 'video' or source_type == 'usb':
 
     if source_type == 'video': cap_arg = img_source
@@ -116,6 +166,16 @@ elif source_type == 'picamera':
     cap.configure(cap.create_video_configuration(main={"format": 'RGB888', "size": (resW, resH)}))
     cap.start()
 
+# Porneste captura pe fir separat: frame-urile sunt citite in paralel cu inferenta
+if source_type in ['video', 'usb', 'picamera']:
+    if source_type == 'picamera':
+        citeste_frame = cap.capture_array
+    else:
+        citeste_frame = citire_videocapture(cap, live=(source_type == 'usb'))
+    # Pentru fisiere video nu se pierde niciun frame; pentru camere se pastreaza doar cele mai noi
+    captura = FrameCapture(citeste_frame, marime_buffer=max(2, batch_size), fara_pierderi=(source_type == 'video'))
+    captura.start()
+
 # Stabileste culorile pentru bounding box-uri (paleta Tableu 10)
 bbox_colors = [(164,120,87), (68,148,228), (93,97,209), (178,182,133), (88,159,106), 
               (96,202,231), (159,124,168), (169,162,241), (98,118,150), (172,176,184)]
@@ -125,82 +185,111 @@ avg_frame_rate = 0
 frame_rate_buffer = []
 fps_avg_len = 200
 img_count = 0
+rezultate_batch = deque()
 
 # Incepe bucla principala de inferenta
 while True:
 
-    t_start = time.perf_counter()  # Porneste cronometru pentru calcularea FPS
+    # In modul batch, cronometrul porneste o data pe batch, iar FPS-ul se calculeaza pe tot batch-ul
+    if batch_size == 1 or not rezultate_batch:
+        t_start = time.perf_counter()  # Porneste cronometru pentru calcularea FPS
+        frames_cronometrate = 0
+
+    if batch_size > 1:
+        # Decodeaza urmatoarele batch_size frame-uri si ruleaza modelul o singura data pe tot batch-ul
+        if not rezultate_batch:
+            frames_batch = []
+            while len(frames_batch) < batch_size:
+                if source_type == 'folder':
+                    if img_count >= len(imgs_list):
+                        break
+                    frame = preincarcare.citeste() if preincarcare is not None else cv2.imread(imgs_list[img_count])
+                    img_count = img_count + 1
+                else:
+                    frame = captura.citeste()
+                    if frame is None:
+                        break
+                if resize == True:
+                    frame = cv2.resize(frame,(resW,resH))
+                frames_batch.append(frame)
+            if frames_batch:
+                rezultate = []
+                for i in range(0, len(frames_batch), lot_model):
+                    rezultate += model(frames_batch[i:i + lot_model], verbose=False)
+                rezultate_batch.extend(zip(frames_batch, rezultate))
+        if not rezultate_batch:
+            print('Toate frame-urile au fost procesate. Programul se va inchide.')
+            break
+        # Rezultatele ies tot cate unul pe frame, in ordinea din sursa
+        frame, rezultat = rezultate_batch.popleft()
 
-    # Incarca un frame din sursa
-    if source_type == 'image' or source_type == 'folder': # Daca sursa e imagine sau folder, incarca imaginea dupa nume
-        if img_count >= len(imgs_list):
-            print('Toate imaginile au fost procesate. Programul se va inchide.')
-            sys.exit(0)
-        img_filename = imgs_list[img_count]
-        frame = cv2.imread(img_filename)
-        img_count = img_count + 1
+    else:
+        # Incarca un frame din sursa
+        if source_type == 'image' or source_type == 'folder': # Daca sursa e imagine sau folder, incarca imaginea dupa nume
+            if img_count >= len(imgs_list):
+                print('Toate imaginile au fost procesate. Programul se va inchide.')
+                sys.exit(0)
+            img_filename = imgs_list[img_count]
+            frame = preincarcare.citeste() if preincarcare is not None else cv2.imread(img_filename)
+            img_count = img_count + 1
     
-    elif source_type == 'video': # Daca sursa este video, incarca urmatorul frame din fisier
-        ret, frame = cap.read()
-        if not ret:
-            print('S-a ajuns la finalul fisierului video. Programul se va inchide.')
-            break
+        elif source_type == 'video': # Daca sursa este video, incarca urmatorul frame din fisier
+            frame = captura.citeste()
+            if frame is None:
+                print('S-a ajuns la finalul fisierului video. Programul se va inchide.')
+                break
     
-    elif source_type == 'usb': # Daca sursa e camera USB, citeste frame din camera
-        ret, frame = cap.read()
-        if (frame is None) or (not ret):
-            print('Nu se pot citi frame-uri din camera. Camera nu este conectata sau nu functioneaza. Programul se va inchide.')
-            break
-
-    elif source_type == 'picamera': # Daca sursa e Picamera, citeste frame folosind Picamera
-        frame = cap.capture_array()
-        if (frame is None):
-            print('Nu se pot citi frame-uri din Picamera. Camera nu este conectata sau nu functioneaza. Programul se va inchide.')
-            break
-
-    # Redimensioneaza frame-ul la rezolutia dorita
-    if resize == True:
-        frame = cv2.resize(frame,(resW,resH))
-
-    # Ruleaza inferenta YOLO pe frame
-    results = model(frame, verbose=False)
-
-    # Extrage rezultatele detectiei
-    detections = results[0].boxes
-
-    # Initializeaza o variabila pentru a numara obiectele detectate
-    object_count = 0
-
-    # Parcurge fiecare detectie si extrage coordonatele, increderea si clasa
-    for i in range(len(detections)):
-
-        # Extrage coordonatele bounding box-ului
-        # Ultralytics intoarce rezultatele in format Tensor, trebuie convertit in array normal
-        xyxy_tensor = detections[i].xyxy.cpu() # Bounding box-uri in format Tensor pe CPU
-        xyxy = xyxy_tensor.numpy().squeeze()   # Converteste Tensorul in array Numpy
-        xmin, ymin, xmax, ymax = xyxy.astype(int) # Extrage coordonatele individuale si le converteste in intregi
-
-        # Extrage ID-ul clasei si numele clasei
-        classidx = int(detections[i].cls.item())
+        elif source_type == 'usb': # Daca sursa e camera USB, citeste frame din camera
+            frame = captura.citeste()
+            if frame is None:
+                print('Nu se pot citi frame-uri din camera. Camera nu este conectata sau nu functioneaza. Programul se va inchide.')
+                break
+
+        elif source_type == 'picamera': # Daca sursa e Picamera, citeste frame folosind Picamera
+            frame = captura.citeste()
+            if (frame is None):
+                print('Nu se pot citi frame-uri din Picamera. Camera nu este conectata sau nu functioneaza. Programul se va inchide.')
+                break
+
+        # Redimensioneaza frame-ul la rezolutia dorita (imaginea originala ramane pentru --tile)
+        frame_original = frame
+        if resize == True:
+            frame = cv2.resize(frame,(resW,resH))
+
+        if tile is not None:
+            # Detectie pe tile-uri din imaginea originala, cu box-urile aduse la rezolutia frame-ului afisat
+            rezultat = None
+            boxes_xyxy, boxes_conf, boxes_cls = detecteaza_pe_tile(model, frame_original, min_thresh, tile,
+                                                                   float(args.tile_overlap), lot=lot_tile)
+            if resize == True:
+                boxes_xyxy = scaleaza_boxes(boxes_xyxy, frame_original.shape, frame.shape)
+        else:
+            # Ruleaza inferenta YOLO pe frame
+            results = model(frame, verbose=False)
+            rezultat = results[0]
+
+    # Extrage rezultatele detectiei o singura data pe frame, ca array-uri Numpy
+    # (coordonatele bounding box-urilor, increderea si clasa) si pastreaza doar detectiile peste prag
+    if rezultat is not None:
+        boxes_xyxy, boxes_conf, boxes_cls = extrage_detectii(rezultat.boxes, min_thresh)
+
+    # Numarul de obiecte detectate este numarul de detectii care au trecut de prag
+    object_count = len(boxes_conf)
+
+    # Parcurge doar detectiile ramase si deseneaza bounding box-urile
+    for (xmin, ymin, xmax, ymax), conf, classidx in zip(boxes_xyxy, boxes_conf, boxes_cls):
+
+        # Extrage numele clasei
         classname = labels[classidx]
 
-        # Extrage increderea pentru bounding box
-        conf = detections[i].conf.item()
-
-        # Deseneaza bounding box-ul doar daca scorul este peste pragul minim
-        if conf > 0.5:
+        color = bbox_colors[classidx % 10]
+        cv2.rectangle(frame, (xmin,ymin), (xmax,ymax), color, 2)
 
-            color = bbox_colors[classidx % 10]
-            cv2.rectangle(frame, (xmin,ymin), (xmax,ymax), color, 2)
-
-            label = f'{classname}: {int(conf*100)}%'
-            labelSize, baseLine = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1) # Calculeaza dimensiunea fontului
-            label_ymin = max(ymin, labelSize[1] + 10) # Evita ca labelul sa fie prea aproape de marginea de sus
-            cv2.rectangle(frame, (xmin, label_ymin-labelSize[1]-10), (xmin+labelSize[0], label_ymin+baseLine-10), color, cv2.FILLED) # Deseneaza o casuta pentru textul labelului
-            cv2.putText(frame, label, (xmin, label_ymin-7), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 1) # Scrie textul labelului
-
-            # Exemplu simplu: incrementeaza numarul de obiecte detectate
-            object_count = object_count + 1
+        label = f'{classname}: {int(conf*100)}%'
+        labelSize, baseLine = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1) # Calculeaza dimensiunea fontului
+        label_ymin = max(ymin, labelSize[1] + 10) # Evita ca labelul sa fie prea aproape de marginea de sus
+        cv2.rectangle(frame, (xmin, label_ymin-labelSize[1]-10), (xmin+labelSize[0], label_ymin+baseLine-10), color, cv2.FILLED) # Deseneaza o casuta pentru textul labelului
+        cv2.putText(frame, label, (xmin, label_ymin-7), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 1) # Scrie textul labelului
 
     # Calculeaza si afiseaza FPS-ul (daca sursa este video sau camera)
     if source_type == 'video' or source_type == 'usb' or source_type == 'picamera':
@@ -212,9 +301,10 @@ while True:
     if record: recorder.write(frame)
 
     # Daca se proceseaza imagini individuale, asteapta apasarea unei taste pentru a trece la urmatoarea imagine. Altfel, asteapta 5ms intre frame-uri.
-    if source_type == 'image' or source_type == 'folder':
+    # In modul batch imaginile din folder sunt parcurse fara sa astepte o tasta.
+    if (source_type == 'image' or source_type == 'folder') and batch_size == 1:
         key = cv2.waitKey()
-    elif source_type == 'video' or source_type == 'usb' or source_type == 'picamera':
+    else:
         key = cv2.waitKey(5)
     
     if key == ord('q') or key == ord('Q'): # Apasa 'q' pentru a iesi din program
@@ -226,7 +316,8 @@ while True:
     
     # Calculeaza FPS-ul pentru acest frame
     t_stop = time.perf_counter()
-    frame_rate_calc = float(1/(t_stop - t_start))
+    frames_cronometrate = frames_cronometrate + 1
+    frame_rate_calc = float(frames_cronometrate/(t_stop - t_start))
 
     # Adauga FPS-ul curent in bufferul de frame rate (pentru a calcula media pe mai multe frame-uri)
     if len(frame_rate_buffer) >= fps_avg_len:
@@ -240,9 +331,13 @@ while True:
 
 # Curata resursele la final
 print(f'Average pipeline FPS: {avg_frame_rate:.2f}')
+if source_type == 'video' or source_type == 'usb' or source_type == 'picamera':
+    captura.stop()
 if source_type == 'video' or source_type == 'usb':
     cap.release()
 elif source_type == 'picamera':
     cap.stop()
 if record: recorder.release()
+if preincarcare is not None:
+    preincarcare.inchide()
 cv2.destroyAllWindows()